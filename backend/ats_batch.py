@@ -0,0 +1,148 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ats_cache import compute_ats_fields
+from ats_vector import vector_scores
+from keyword_dictionary import get_keyword_index, reload_keyword_index
+from metrics import ats_batch_chunk_duration
+
+BATCH_WORKERS = int(os.environ.get("ATS_BATCH_WORKERS", str(os.cpu_count() or 1)))
+BATCH_CHUNK_SIZE = int(os.environ.get("ATS_BATCH_CHUNK_SIZE", "100"))
+MAX_BATCH_SIZE = int(os.environ.get("ATS_BATCH_MAX_SIZE", "5000"))
+
+# Spawned (not forked) workers so they never inherit the server's event loop,
+# Mongo client or threads; each loads the precompiled keyword index on start
+_mp_context = multiprocessing.get_context("spawn")
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _init_worker():
+    get_keyword_index()
+
+
+def _worker_index(keyword_version: str):
+    keyword_index = get_keyword_index()
+    if keyword_index.version != keyword_version:
+        reload_keyword_index()
+        keyword_index = get_keyword_index()
+    return keyword_index
+
+
+def _score_chunk(resumes: List[dict], keyword_version: str) -> List[dict]:
+    keyword_index = _worker_index(keyword_version)
+    return [compute_ats_fields(resume, keyword_index) for resume in resumes]
+
+
+def _vector_chunk(resumes: List[dict], keyword_version: str) -> List[dict]:
+    return vector_scores(resumes, _worker_index(keyword_version))
+
+
+# "full" yields the complete ATS fields; "vector" yields score/coverage/similarity
+_CHUNK_SCORERS = {"full": _score_chunk, "vector": _vector_chunk}
+
+
+def _new_executor(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context, initializer=_init_worker)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = _new_executor(BATCH_WORKERS)
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def score_batch(resumes: Iterable[dict], workers: Optional[int] = None,
+                chunk_size: Optional[int] = None, mode: str = "full") -> Iterator[Tuple[int, dict]]:
+    """Score ``resumes`` across a process pool, yielding ``(position, result)``.
+
+    Results are yielded per chunk as soon as it finishes, so they are not in
+    input order.
+    """
+    scorer = _CHUNK_SCORERS[mode]
+    chunk_size = chunk_size or BATCH_CHUNK_SIZE
+    keyword_version = get_keyword_index().version
+    with _new_executor(workers or BATCH_WORKERS) as pool:
+        futures = {}
+        for n, chunk in enumerate(_chunks(resumes, chunk_size)):
+            futures[pool.submit(scorer, chunk, keyword_version)] = n * chunk_size
+        for future in as_completed(futures):
+            start = futures[future]
+            for offset, fields in enumerate(future.result()):
+                yield start + offset, fields
+
+
+async def _achunks(items, size: int) -> AsyncIterator[list]:
+    if not hasattr(items, "__aiter__"):
+        for chunk in _chunks(items, size):
+            yield chunk
+        return
+
+    chunk = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def ascore_batch(items: Union[Iterable, AsyncIterator], chunk_size: Optional[int] = None,
+                       max_pending: Optional[int] = None, mode: str = "full") -> AsyncIterator[Tuple[object, dict]]:
+    """Score ``(key, resume)`` pairs on the shared process pool, yielding ``(key, result)``.
+
+    ``items`` may be a plain or async iterable (e.g. a Motor cursor). At most
+    ``max_pending`` chunks are in flight, so large inputs are consumed as
+    results are drained rather than loaded up front.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    scorer = _CHUNK_SCORERS[mode]
+    chunk_size = chunk_size or BATCH_CHUNK_SIZE
+    max_pending = max_pending or BATCH_WORKERS * 2
+    keyword_version = get_keyword_index().version
+
+    async def run(chunk):
+        keys = [key for key, _ in chunk]
+        with ats_batch_chunk_duration.time(mode=mode):
+            results = await loop.run_in_executor(
+                executor, scorer, [resume for _, resume in chunk], keyword_version
+            )
+        return list(zip(keys, results))
+
+    pending = set()
+    try:
+        async for chunk in _achunks(items, chunk_size):
+            pending.add(asyncio.ensure_future(run(chunk)))
+            if len(pending) >= max_pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for pair in task.result():
+                        yield pair
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for pair in task.result():
+                    yield pair
+    finally:
+        for task in pending:
+            task.cancel()
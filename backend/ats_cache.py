@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+from ats_engine import SECTIONS, combine_sections, score_section, score_sections
+from cache import LRUCache, TieredCache, shared_backend
+from keyword_dictionary import KeywordIndex, get_keyword_index
+from metrics import ats_scoring_duration
+
+score_cache = TieredCache(
+    LRUCache(maxsize=int(os.environ.get("ATS_SCORE_CACHE_SIZE", "4096"))),
+    shared_backend("ats-score"),
+    shared_ttl=float(os.environ.get("ATS_SCORE_CACHE_TTL", "86400")),
+)
+
+
+# Everything score_resume reads from a stored resume
+SCORING_PROJECTION = {
+    "_id": 0,
+    **{section: 1 for section in SECTIONS},
+    "ats_result": 1,
+    "ats_sections": 1,
+    "ats_fingerprint": 1,
+    "ats_keywords_version": 1,
+}
+
+
+def score_fingerprint(resume: dict, keyword_version: str) -> str:
+    content = json.dumps(
+        {section: resume.get(section) for section in SECTIONS},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(f"{keyword_version}:{content}".encode()).hexdigest()
+
+
+def build_ats_fields(fingerprint: str, ats_result: dict, ats_sections: dict, keyword_version: str) -> dict:
+    return {
+        "ats_score": ats_result["score"],
+        "ats_result": ats_result,
+        "ats_sections": ats_sections,
+        "ats_fingerprint": fingerprint,
+        "ats_keywords_version": keyword_version,
+    }
+
+
+def compute_ats_fields(resume: dict, keyword_index: KeywordIndex) -> dict:
+    """Score ``resume`` from scratch without touching any cache (used by batch workers)."""
+    sections = score_sections(resume, keyword_index)
+    return build_ats_fields(
+        score_fingerprint(resume, keyword_index.version),
+        combine_sections(sections, keyword_index),
+        sections,
+        keyword_index.version,
+    )
+
+
+async def score_resume(resume: dict, previous: Optional[dict] = None) -> dict:
+    """Return the ATS fields to store on ``resume``, reusing earlier work where possible.
+
+    A result stored on the document itself is trusted when its fingerprint
+    still matches. Otherwise, when ``previous`` (the stored version of the
+    document) was scored against the current keyword dictionaries, only the
+    sections that differ from it are re-scored.
+    """
+    started = time.perf_counter()
+    keyword_index = get_keyword_index()
+    fingerprint = score_fingerprint(resume, keyword_index.version)
+
+    source = "stored"
+    if resume.get("ats_fingerprint") == fingerprint and resume.get("ats_sections"):
+        cached = {"ats_result": resume["ats_result"], "ats_sections": resume["ats_sections"]}
+    else:
+        source = "cache"
+        cached = await score_cache.get(fingerprint)
+
+    if cached is None:
+        source = "computed"
+        reusable = {}
+        if previous and previous.get("ats_keywords_version") == keyword_index.version:
+            reusable = previous.get("ats_sections") or {}
+
+        sections = {}
+        for section in SECTIONS:
+            value = resume.get(section)
+            if section in reusable and previous.get(section) == value:
+                sections[section] = reusable[section]
+            else:
+                sections[section] = score_section(section, value, keyword_index)
+
+        cached = {"ats_result": combine_sections(sections, keyword_index), "ats_sections": sections}
+        await score_cache.set(fingerprint, cached)
+
+    ats_scoring_duration.observe(time.perf_counter() - started, source=source)
+    return build_ats_fields(fingerprint, cached["ats_result"], cached["ats_sections"], keyword_index.version)
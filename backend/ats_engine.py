@@ -1,110 +1,138 @@
-from typing import List, Dict
-import re
-
-ATS_KEYWORDS = {
-    "tech": [
-        "python", "javascript", "react", "node", "java", "sql", "aws", "docker",
-        "kubernetes", "api", "mongodb", "postgresql", "git", "agile", "scrum",
-        "typescript", "vue", "angular", "django", "fastapi", "flask", "spring"
-    ],
-    "business": [
-        "strategy", "analysis", "stakeholder", "project management", "budget",
-        "leadership", "communication", "collaboration", "presentation", "excel",
-        "powerpoint", "data analysis", "market research", "roi", "kpi"
-    ],
-    "general": [
-        "problem solving", "team player", "analytical", "detail-oriented",
-        "time management", "multitasking", "organized", "self-motivated",
-        "proactive", "adaptable", "innovative", "results-driven"
-    ]
-}
-
-def calculate_ats_score(resume_data: dict) -> Dict[str, any]:
+from typing import Dict, Optional, Iterable
+
+from keyword_dictionary import KeywordIndex, get_keyword_index
+
+# Resume sections that contribute to the score, in suggestion order
+SECTIONS = (
+    "personal_info", "professional_summary", "skills",
+    "work_experience", "education", "projects"
+)
+
+def section_text(section: str, value) -> str:
+    if section == "professional_summary":
+        return value or ""
+    if section == "skills":
+        return " ".join(value or [])
+
+    parts = []
+    if section == "work_experience":
+        for exp in value or []:
+            parts.append(exp.get("position", ""))
+            parts.append(" ".join(exp.get("description", [])))
+    elif section == "education":
+        for edu in value or []:
+            parts.append(edu.get("degree", ""))
+            parts.append(edu.get("field", ""))
+    elif section == "projects":
+        for proj in value or []:
+            parts.append(proj.get("name", ""))
+            parts.append(proj.get("description", ""))
+            parts.append(" ".join(proj.get("technologies", [])))
+    return " ".join(parts)
+
+def score_section(section: str, value, keyword_index: KeywordIndex) -> Dict[str, any]:
+    """Keyword hits and structural facts for one section.
+
+    Contributions are stored on the resume so a partial update only
+    re-scores the sections it touched (see ``combine_sections``).
+    """
+    contribution = {"keywords": [], "present": bool(value)}
+
+    text = section_text(section, value).lower()
+    if text.strip():
+        found = keyword_index.find_terms(text)
+        contribution["keywords"] = [keyword_index.terms[i] for i in sorted(found)]
+
+    if section in ("skills", "work_experience", "education"):
+        contribution["count"] = len(value or [])
+    if section == "work_experience":
+        contribution["has_bullets"] = any(
+            len(exp.get("description", [])) >= 2
+            for exp in value or []
+        )
+    return contribution
+
+def score_sections(resume_data: dict, keyword_index: KeywordIndex, sections: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+    return {
+        section: score_section(section, resume_data.get(section), keyword_index)
+        for section in (sections if sections is not None else SECTIONS)
+    }
+
+def combine_sections(contributions: Dict[str, dict], keyword_index: KeywordIndex) -> Dict[str, any]:
     score = 0
     suggestions = []
+
+    # Union keyword hits across sections
+    found = set()
+    for contribution in contributions.values():
+        for term in contribution["keywords"]:
+            i = keyword_index.term_positions.get(term)
+            if i is not None:
+                found.add(i)
+    found_weight = sum(keyword_index.weights[i] for i in found)
+
+    # Terms are ordered by weight, so the first misses are the most valuable
     missing_keywords = []
-    
-    # Combine all text from resume
-    resume_text = ""
-    resume_text += resume_data.get("professional_summary", "") + " "
-    resume_text += " ".join(resume_data.get("skills", [])) + " "
-    
-    for exp in resume_data.get("work_experience", []):
-        resume_text += exp.get("position", "") + " "
-        resume_text += " ".join(exp.get("description", [])) + " "
-    
-    for edu in resume_data.get("education", []):
-        resume_text += edu.get("degree", "") + " "
-        resume_text += edu.get("field", "") + " "
-    
-    for proj in resume_data.get("projects", []):
-        resume_text += proj.get("name", "") + " "
-        resume_text += proj.get("description", "") + " "
-        resume_text += " ".join(proj.get("technologies", [])) + " "
-    
-    resume_text = resume_text.lower()
-    
-    # Check for keywords
-    all_keywords = ATS_KEYWORDS["tech"] + ATS_KEYWORDS["business"] + ATS_KEYWORDS["general"]
-    found_keywords = 0
-    
-    for keyword in all_keywords:
-        if keyword.lower() in resume_text:
-            found_keywords += 1
-        else:
-            missing_keywords.append(keyword)
-    
-    # Base score on keyword coverage
-    keyword_score = int((found_keywords / len(all_keywords)) * 40)
+    for i, term in enumerate(keyword_index.terms):
+        if i not in found:
+            missing_keywords.append(term)
+            if len(missing_keywords) == 10:
+                break
+
+    # Base score on weighted keyword coverage
+    if keyword_index.total_weight:
+        keyword_score = int((found_weight / keyword_index.total_weight) * 40)
+    else:
+        keyword_score = 0
     score += keyword_score
-    
+
     # Check formatting (ATS-friendly structure)
-    if resume_data.get("personal_info"):
+    if contributions["personal_info"]["present"]:
         score += 10
     else:
         suggestions.append("Add personal information section")
-    
-    if resume_data.get("professional_summary"):
+
+    if contributions["professional_summary"]["present"]:
         score += 10
     else:
         suggestions.append("Add a professional summary")
-    
-    if len(resume_data.get("skills", [])) >= 5:
+
+    if contributions["skills"]["count"] >= 5:
         score += 10
     else:
         suggestions.append("Add at least 5 relevant skills")
-    
-    if len(resume_data.get("work_experience", [])) > 0:
+
+    if contributions["work_experience"]["count"] > 0:
         score += 15
         # Check bullet points
-        has_bullets = any(
-            len(exp.get("description", [])) >= 2 
-            for exp in resume_data.get("work_experience", [])
-        )
-        if has_bullets:
+        if contributions["work_experience"]["has_bullets"]:
             score += 10
         else:
             suggestions.append("Add bullet points to work experience descriptions")
     else:
         suggestions.append("Add work experience")
-    
-    if len(resume_data.get("education", [])) > 0:
+
+    if contributions["education"]["count"] > 0:
         score += 5
     else:
         suggestions.append("Add education information")
-    
+
     # Cap score at 100
     score = min(score, 100)
-    
+
     if score < 70:
         suggestions.insert(0, "Your ATS score is low. Add more relevant keywords and complete all sections.")
     elif score < 85:
         suggestions.insert(0, "Good progress! Add more industry-specific keywords to improve your score.")
     else:
         suggestions.insert(0, "Excellent! Your resume is well-optimized for ATS systems.")
-    
+
     return {
         "score": score,
         "suggestions": suggestions[:5],  # Top 5 suggestions
         "missing_keywords": missing_keywords[:10]  # Top 10 missing keywords
     }
+
+def calculate_ats_score(resume_data: dict, keyword_index: Optional[KeywordIndex] = None) -> Dict[str, any]:
+    keyword_index = keyword_index or get_keyword_index()
+    return combine_sections(score_sections(resume_data, keyword_index), keyword_index)
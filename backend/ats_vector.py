@@ -0,0 +1,94 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ats_engine import SECTIONS, section_text
+from keyword_dictionary import KeywordIndex, get_keyword_index
+
+
+def _extract(resumes: Sequence[dict], keyword_index: KeywordIndex):
+    """Sparse (COO) term counts plus the structural facts the score needs.
+
+    Sections are joined with newlines, which no keyword spans, so the hits
+    equal the union of per-section hits used by ``calculate_ats_score``.
+    """
+    rows, cols, counts = [], [], []
+    structure = np.zeros((len(resumes), 6), dtype=np.int32)
+
+    for row, resume in enumerate(resumes):
+        text = "\n".join(section_text(section, resume.get(section)) for section in SECTIONS).lower()
+        for term, n in keyword_index.count_terms(text).items():
+            rows.append(row)
+            cols.append(term)
+            counts.append(n)
+
+        work_experience = resume.get("work_experience") or []
+        structure[row] = (
+            bool(resume.get("personal_info")),
+            bool(resume.get("professional_summary")),
+            len(resume.get("skills") or []),
+            len(work_experience),
+            any(len(exp.get("description", [])) >= 2 for exp in work_experience),
+            len(resume.get("education") or []),
+        )
+
+    return (
+        np.asarray(rows, dtype=np.int64),
+        np.asarray(cols, dtype=np.int64),
+        np.asarray(counts, dtype=np.float64),
+        structure,
+    )
+
+
+def vector_scores(resumes: Sequence[dict], keyword_index: Optional[KeywordIndex] = None) -> List[Dict[str, float]]:
+    """Score a batch of resumes with array operations over sparse term vectors.
+
+    Returns, per resume, the same ``score`` as ``calculate_ats_score`` plus:
+
+    - ``coverage``: weighted share of dictionary terms present (0-1)
+    - ``similarity``: cosine similarity between the resume's TF-IDF vector
+      (IDF taken over this batch) and the weighted dictionary profile (0-1)
+    """
+    keyword_index = keyword_index or get_keyword_index()
+    n = len(resumes)
+    if n == 0:
+        return []
+
+    rows, cols, counts, structure = _extract(resumes, keyword_index)
+    weights = np.asarray(keyword_index.weights, dtype=np.float64)
+    vocab_size = len(weights)
+
+    # Weighted coverage: each (resume, term) pair appears once in the COO arrays
+    found_weight = np.bincount(rows, weights=weights[cols], minlength=n)
+    total_weight = keyword_index.total_weight
+    coverage = found_weight / total_weight if total_weight else np.zeros(n)
+
+    # TF-IDF with sublinear TF, smoothed IDF over the batch
+    document_frequency = np.bincount(cols, minlength=vocab_size)
+    idf = np.log((1 + n) / (1 + document_frequency)) + 1
+    tfidf = (1 + np.log(counts)) * idf[cols]
+    profile = weights * idf
+    dot = np.bincount(rows, weights=tfidf * profile[cols], minlength=n)
+    norms = np.sqrt(np.bincount(rows, weights=tfidf * tfidf, minlength=n))
+    profile_norm = np.linalg.norm(profile)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarity = np.where(norms > 0, dot / (norms * profile_norm), 0.0)
+
+    # Same structure rules as combine_sections
+    has_personal, has_summary, skills, work, bullets, education = structure.T
+    keyword_score = np.floor(coverage * 40).astype(np.int64)
+    score = (
+        keyword_score
+        + 10 * has_personal
+        + 10 * has_summary
+        + 10 * (skills >= 5)
+        + 15 * (work > 0)
+        + 10 * ((work > 0) & (bullets > 0))
+        + 5 * (education > 0)
+    )
+    score = np.minimum(score, 100)
+
+    return [
+        {"score": int(s), "coverage": round(float(c), 4), "similarity": round(float(sim), 4)}
+        for s, c, sim in zip(score, coverage, similarity)
+    ]
@@ -2,26 +2,49 @@ from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 import os
+import uuid
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Raising the cost upgrades existing hashes on their next successful login
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_DAYS = 30
 
+# Embed the user's profile in the token so requests authenticate without a users lookup
+AUTH_STATELESS = os.environ.get("AUTH_STATELESS", "false").lower() in ("1", "true", "yes")
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """Return ``(valid, new_hash)``; ``new_hash`` is set when the stored hash is outdated."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(days=ACCESS_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire})
+    # ``jti`` identifies the token for logout
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_user_token(user: dict) -> str:
+    """Token for ``user``; ``ver`` must match the account's ``token_version`` to stay valid."""
+    claims = {"sub": user["id"], "ver": user.get("token_version", 0)}
+    if AUTH_STATELESS:
+        claims.update({
+            "email": user["email"],
+            "name": user["full_name"],
+            "created_at": user["created_at"].isoformat() if isinstance(user["created_at"], datetime) else user["created_at"],
+        })
+    return create_access_token(claims)
+
 def decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
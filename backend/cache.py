@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Shared caching is optional
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.environ.get("REDIS_URL")
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded in-process cache with least-recently-used eviction and optional TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisBackend:
+    """JSON values in Redis under a key prefix. Errors are logged and treated as misses."""
+
+    def __init__(self, url: str, prefix: str):
+        self.prefix = prefix
+        self._client = aioredis.from_url(url)
+
+    async def get(self, key: str):
+        try:
+            raw = await self._client.get(f"{self.prefix}:{key}")
+        except Exception as e:
+            logger.warning(f"Shared cache get failed: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value, ttl: Optional[float] = None):
+        try:
+            await self._client.set(f"{self.prefix}:{key}", json.dumps(value, default=str), ex=int(ttl) if ttl else None)
+        except Exception as e:
+            logger.warning(f"Shared cache set failed: {e}")
+
+    async def delete(self, key: str):
+        try:
+            await self._client.delete(f"{self.prefix}:{key}")
+        except Exception as e:
+            logger.warning(f"Shared cache delete failed: {e}")
+
+
+def shared_backend(prefix: str) -> Optional[RedisBackend]:
+    """Return a Redis backend when ``REDIS_URL`` is set and redis is installed."""
+    if not REDIS_URL:
+        return None
+    if aioredis is None:
+        logger.warning("REDIS_URL is set but the redis package is not installed; using in-process caches only")
+        return None
+    return RedisBackend(REDIS_URL, prefix)
+
+
+class TieredCache:
+    """In-process LRU in front of an optional shared backend."""
+
+    def __init__(self, local: LRUCache, shared: Optional[RedisBackend] = None, shared_ttl: Optional[float] = None):
+        self.local = local
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+
+    async def get(self, key: str):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value, ttl: Optional[float] = None):
+        self.local.set(key, value, ttl)
+        if self.shared is not None:
+            await self.shared.set(key, value, ttl or self.shared_ttl)
+
+    async def delete(self, key: str):
+        self.local.delete(key)
+        if self.shared is not None:
+            await self.shared.delete(key)
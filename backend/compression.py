@@ -0,0 +1,216 @@
+import asyncio
+import os
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Zstandard is optional
+    zstandard = None
+
+# Bodies smaller than this go out as-is; compression would barely pay for its headers
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.environ.get("COMPRESSION_ZSTD_LEVEL", "3"))
+# Whole bodies above this are compressed on a worker thread instead of the event loop
+COMPRESSION_THREAD_THRESHOLD = int(os.environ.get("COMPRESSION_THREAD_THRESHOLD", str(256 * 1024)))
+
+# Only text-like types; PDFs, ZIPs and images are already compressed
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+)
+
+
+class _GzipEncoder:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        # Sync flush so every streamed chunk reaches the client straight away
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Available encodings in server preference order, used to break q-value ties
+ENCODERS: Dict[str, type] = {
+    **({"zstd": _ZstdEncoder} if zstandard is not None else {}),
+    **({"br": _BrotliEncoder} if brotli is not None else {}),
+    "gzip": _GzipEncoder,
+}
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best available encoding for an Accept-Encoding header, or None for identity."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+
+    best, best_weight = None, 0.0
+    for name in ENCODERS:
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+
+def _compress_whole(encoding: str, body: bytes) -> bytes:
+    encoder = ENCODERS[encoding]()
+    return encoder.compress(body) + encoder.finish()
+
+
+class CompressionMiddleware:
+    """Compress text responses with zstd, brotli or gzip, whichever the client prefers.
+
+    Streaming responses are compressed chunk by chunk and flushed as they go.
+    Compressed responses get a weak ETag, since their bytes differ from the
+    identity representation.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app, encoding: Optional[str], minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send = None
+        self.start_message = None
+        self.encoder = None
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message):
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether it is worth compressing
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            if self.start_message is not None:
+                await self.send(self.start_message)
+                self.start_message = None
+            await self.send(message)
+            return
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            await self._start(start, message)
+            return
+
+        if self.encoder is None:
+            await self.send(message)
+            return
+
+        more_body = message.get("more_body", False)
+        body = self.encoder.compress(message.get("body", b""))
+        if not more_body:
+            body += self.encoder.finish()
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    @staticmethod
+    def _weaken_etag(headers: MutableHeaders):
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    async def _start(self, start, message):
+        headers = MutableHeaders(raw=start["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        compressible = (
+            start["status"] not in (204, 304)
+            and "content-encoding" not in headers
+            and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+        )
+        if compressible:
+            # The representation depends on Accept-Encoding even when sent uncompressed
+            headers.add_vary_header("Accept-Encoding")
+
+        if start["status"] == 304 and self.encoding is not None:
+            # Validate the same tag the compressed 200 carried; a 304 has no body or type to go on
+            content_type = headers.get("content-type")
+            if content_type is None or content_type.startswith(COMPRESSIBLE_TYPES):
+                self._weaken_etag(headers)
+
+        if not compressible or self.encoding is None or (not more_body and len(body) < self.minimum_size):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        self._weaken_etag(headers)
+
+        if more_body:
+            del headers["Content-Length"]
+            self.encoder = ENCODERS[self.encoding]()
+            body = self.encoder.compress(body)
+        elif len(body) > COMPRESSION_THREAD_THRESHOLD:
+            body = await asyncio.to_thread(_compress_whole, self.encoding, body)
+        else:
+            body = _compress_whole(self.encoding, body)
+        if not more_body:
+            headers["Content-Length"] = str(len(body))
+
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+logger = logging.getLogger(__name__)
+
+INDEX_PROGRESS_INTERVAL = float(os.environ.get("MONGO_INDEX_PROGRESS_INTERVAL", "10"))
+# Explain the hot queries after the build and warn about any collection scans
+INDEX_SELF_TEST = os.environ.get("MONGO_INDEX_SELF_TEST", "true").lower() in ("1", "true", "yes")
+
+# Every index the application relies on, by collection
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("id", ASCENDING)], unique=True),
+        # Incremental token revocation refresh
+        IndexModel([("token_version_updated_at", ASCENDING)], sparse=True),
+    ],
+    "resumes": [
+        IndexModel([("user_id", ASCENDING), ("id", ASCENDING)], unique=True),
+        # Per-user listing, newest first, with ``id`` as the tie-breaker
+        IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING), ("id", DESCENDING)]),
+    ],
+    "resume_terms": [
+        IndexModel([("resume_id", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING), ("terms", ASCENDING)]),
+    ],
+    "export_jobs": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("status", ASCENDING), ("run_after", ASCENDING), ("created_at", ASCENDING)]),
+        IndexModel([("expires_at", ASCENDING)]),
+    ],
+    "revoked_tokens": [
+        IndexModel([("jti", ASCENDING)], unique=True),
+        IndexModel([("revoked_at", ASCENDING)]),
+        # MongoDB drops entries once the token they revoke has expired anyway
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+}
+
+# (collection, filter, sort) for the queries the API runs on every request
+QUERY_PLAN_CHECKS: List[Tuple[str, dict, Optional[list]]] = [
+    ("users", {"email": "self-test@example.com"}, None),
+    ("users", {"id": "self-test"}, None),
+    ("resumes", {"id": "self-test", "user_id": "self-test"}, None),
+    ("resumes", {"user_id": "self-test"}, [("updated_at", DESCENDING), ("id", DESCENDING)]),
+    ("resume_terms", {"user_id": "self-test", "terms": {"$in": ["python"]}}, None),
+    ("export_jobs", {"id": "self-test", "user_id": "self-test"}, None),
+    ("revoked_tokens", {"jti": "self-test"}, None),
+]
+
+
+def _key(spec) -> tuple:
+    # index_information() returns (field, direction) pairs, IndexModel a SON
+    items = spec.items() if isinstance(spec, dict) else spec
+    return tuple((field, direction if isinstance(direction, str) else int(direction)) for field, direction in items)
+
+
+async def _report_progress(db, collection: str, done: asyncio.Event):
+    """Log ``createIndexes`` progress from ``$currentOp`` until ``done`` is set."""
+    while True:
+        try:
+            await asyncio.wait_for(done.wait(), INDEX_PROGRESS_INTERVAL)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+        try:
+            ops = db.client.admin.aggregate([
+                {"$currentOp": {"allUsers": True, "idleConnections": False}},
+                {"$match": {"command.createIndexes": collection}},
+            ])
+            async for op in ops:
+                progress = op.get("progress") or {}
+                if progress.get("total"):
+                    logger.info(
+                        f"Building indexes on {collection}: {op.get('msg', '')} "
+                        f"{progress.get('done', 0)}/{progress['total']}"
+                    )
+                else:
+                    logger.info(f"Building indexes on {collection}: {op.get('msg', 'in progress')}")
+        except Exception as e:
+            # $currentOp needs extra privileges on some hosted clusters
+            logger.info(f"Still building indexes on {collection} (progress unavailable: {e})")
+
+
+async def ensure_indexes(db) -> List[str]:
+    """Create any declared index that is missing; returns the names of those created."""
+    created = []
+    for collection, models in INDEXES.items():
+        existing = {_key(info["key"]) for info in (await db[collection].index_information()).values()}
+        missing = [model for model in models if _key(model.document["key"]) not in existing]
+
+        if not missing:
+            continue
+
+        names = ", ".join(model.document["name"] for model in missing)
+        logger.info(f"Creating indexes on {collection}: {names}")
+        done = asyncio.Event()
+        reporter = asyncio.create_task(_report_progress(db, collection, done))
+        try:
+            # One at a time, so an index that cannot be built does not hold back the rest
+            for model in missing:
+                options = {name: value for name, value in model.document.items() if name != "key"}
+                try:
+                    created.append(await db[collection].create_index(list(model.document["key"].items()), **options))
+                except Exception:
+                    # e.g. duplicate emails block the unique index; keep serving and say why
+                    logger.exception(f"Could not create index {options['name']} on {collection}")
+        finally:
+            done.set()
+            await reporter
+    if created:
+        logger.info(f"Created {len(created)} indexes")
+    return created
+
+
+def _plan_stages(plan) -> List[dict]:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan)
+        for value in plan.values():
+            stages += _plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            stages += _plan_stages(value)
+    return stages
+
+
+async def check_query_plans(db) -> Dict[str, Optional[str]]:
+    """Explain each hot query; maps a description to the index used, or None for a collection scan."""
+    results = {}
+    for collection, query, sort in QUERY_PLAN_CHECKS:
+        description = f"{collection} {sorted(query)}" + (f" sorted by {[field for field, _ in sort]}" if sort else "")
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            explain = await cursor.explain()
+        except Exception as e:
+            logger.warning(f"Could not explain {description}: {e}")
+            continue
+
+        stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        index_names = [stage["indexName"] for stage in stages if "indexName" in stage]
+        if any(stage["stage"] == "COLLSCAN" for stage in stages) or not index_names:
+            logger.warning(f"Query plan self-test: {description} uses a collection scan")
+            results[description] = None
+        else:
+            results[description] = index_names[0]
+    return results
+
+
+async def prepare_indexes(db):
+    try:
+        await ensure_indexes(db)
+    except Exception:
+        logger.exception("Index preparation failed")
+        return
+    if INDEX_SELF_TEST:
+        plans = await check_query_plans(db)
+        scans = [description for description, index in plans.items() if index is None]
+        if not scans:
+            logger.info(f"Query plan self-test passed for {len(plans)} queries")
@@ -0,0 +1,40 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fields that used to be stored as ISO strings and are now BSON dates
+DATE_FIELDS = {
+    "users": ("created_at",),
+    "resumes": ("created_at", "updated_at"),
+}
+
+
+async def _migrate_dates(db, collection: str, name: str, query: dict) -> int:
+    result = await db[collection].update_many(
+        {**query, name: {"$type": "string"}},
+        [{"$set": {name: {"$dateFromString": {"dateString": f"${name}"}}}}],
+    )
+    return result.modified_count
+
+
+async def migrate_iso_dates(db):
+    """Convert legacy ISO-string timestamps to native dates, server-side and idempotently."""
+    for collection, fields in DATE_FIELDS.items():
+        for name in fields:
+            try:
+                modified = await _migrate_dates(db, collection, name, {})
+            except Exception:
+                logger.exception(f"Could not migrate {collection}.{name} to dates")
+                continue
+            if modified:
+                logger.info(f"Migrated {modified} {collection}.{name} values to dates")
+
+
+async def migrate_user_resume_dates(db, user_id: str):
+    """Convert one user's resume timestamps ahead of the background migration.
+
+    BSON orders every string before every date, so keyset pages over a mix
+    of both would skip the legacy resumes.
+    """
+    for name in DATE_FIELDS["resumes"]:
+        await _migrate_dates(db, "resumes", name, {"user_id": user_id})
@@ -0,0 +1,214 @@
+import asyncio
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter as StackCounts
+from pathlib import Path
+from typing import Optional
+
+from starlette.datastructures import Headers
+
+from metrics import Counter, registry
+
+logger = logging.getLogger(__name__)
+
+# Log the loop thread's stack when the loop stalls this long (seconds); 0 disables the watchdog
+LOOP_BLOCK_THRESHOLD = float(os.environ.get("DIAGNOSTICS_LOOP_BLOCK_THRESHOLD", "0"))
+
+# Fraction of requests to profile at random
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+# Requests sending this value in the X-Profile header are always profiled; unset disables the header
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN")
+PROFILE_HEADER = "X-Profile"
+# "sample" writes folded stacks for flame graphs; "cprofile" writes pstats
+PROFILE_MODE = os.environ.get("PROFILE_MODE", "sample")
+# Sampled requests faster than this are discarded; header-triggered ones are always kept
+PROFILE_SLOW_THRESHOLD = float(os.environ.get("PROFILE_SLOW_THRESHOLD", "0.5"))
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", "0.005"))
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", "/tmp/profiles"))
+
+PROFILING_ENABLED = PROFILE_SAMPLE_RATE > 0 or bool(PROFILE_TOKEN)
+
+loop_blocks = registry.register(Counter(
+    "event_loop_blocks_total", "Times the event loop stalled past the watchdog threshold."
+))
+
+
+class LoopWatchdog:
+    """Logs what the event loop thread is running whenever the loop stops responding.
+
+    A callback on the loop stamps a heartbeat; a separate thread checks it,
+    so the check still runs while a handler holds the loop.
+    """
+
+    def __init__(self, threshold: float = LOOP_BLOCK_THRESHOLD):
+        self.threshold = threshold
+        self.interval = max(threshold / 4, 0.01)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start watching the running loop; call from the loop's thread."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._handle is not None:
+            self._handle.cancel()
+
+    def _heartbeat(self):
+        self._last_beat = time.monotonic()
+        self._handle = self._loop.call_later(self.interval, self._heartbeat)
+
+    def _watch(self):
+        blocked_beat = None
+        while not self._stopped.wait(self.interval):
+            beat = self._last_beat
+            if beat == blocked_beat:
+                continue
+            if blocked_beat is not None:
+                # The heartbeat was due one interval after the beat it was stuck on
+                logger.warning(f"Event loop unblocked after {beat - blocked_beat - self.interval:.3f}s")
+                blocked_beat = None
+
+            stalled = time.monotonic() - beat - self.interval
+            if stalled >= self.threshold:
+                blocked_beat = beat
+                loop_blocks.inc()
+                self._report(stalled)
+
+    def _report(self, stalled: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "(unavailable)\n"
+        task = asyncio.current_task(self._loop)
+        running = f" in task {task.get_name()} ({task.get_coro().__qualname__})" if task is not None else ""
+        logger.warning(f"Event loop blocked for {stalled:.3f}s{running}; loop thread stack:\n{stack}")
+
+
+class _CProfiler:
+    suffix = "pstats"
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    def write(self, path: Path):
+        self._profile.dump_stats(path)
+
+
+class _StackSampler:
+    """Samples the loop thread's stack from another thread, for folded-stack flame graphs."""
+
+    suffix = "folded"
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = StackCounts()
+        self._thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        # Called on the loop, so the sampler thread is joined in write() instead
+        self._stopped.set()
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            names = []
+            while frame is not None:
+                names.append(f"{Path(frame.f_code.co_filename).stem}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def write(self, path: Path):
+        self._thread.join()
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()))
+
+
+PROFILERS = {"cprofile": _CProfiler, "sample": _StackSampler}
+
+if PROFILE_MODE not in PROFILERS:
+    raise ValueError(f"PROFILE_MODE must be one of {', '.join(PROFILERS)}, not {PROFILE_MODE!r}")
+
+
+class ProfilerMiddleware:
+    """Profiles a random sample of requests, plus any that send ``X-Profile: <PROFILE_TOKEN>``.
+
+    Profiling covers the whole loop thread while the request runs, so
+    concurrent requests show up too; only one request is profiled at a time.
+    """
+
+    def __init__(self, app, sample_rate: float = PROFILE_SAMPLE_RATE, token: Optional[str] = PROFILE_TOKEN,
+                 mode: str = PROFILE_MODE, slow_threshold: float = PROFILE_SLOW_THRESHOLD,
+                 directory: Path = PROFILE_DIR):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.token = token
+        self.profiler_class = PROFILERS[mode]
+        self.slow_threshold = slow_threshold
+        self.directory = directory
+        self._busy = False
+
+    def _requested(self, scope) -> bool:
+        value = Headers(scope=scope).get(PROFILE_HEADER)
+        return bool(self.token and value and hmac.compare_digest(value, self.token))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._busy:
+            await self.app(scope, receive, send)
+            return
+        requested = self._requested(scope)
+        if not requested and random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        profiler = self.profiler_class()
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            self._busy = False
+            elapsed = time.perf_counter() - started
+            if requested or elapsed >= self.slow_threshold:
+                await self._save(profiler, scope, elapsed)
+
+    async def _save(self, profiler, scope, elapsed: float):
+        route = getattr(scope.get("route"), "path", None) or scope["path"]
+        name = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        path = self.directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{name}-{elapsed * 1000:.0f}ms-{uuid.uuid4().hex[:6]}.{profiler.suffix}"
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(profiler.write, path)
+        except OSError as e:
+            logger.warning(f"Could not write profile for {scope['method']} {scope['path']}: {e}")
+            return
+        logger.info(f"Profiled {scope['method']} {scope['path']} ({elapsed * 1000:.0f} ms): {path}")
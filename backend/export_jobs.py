@@ -0,0 +1,262 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pymongo import ASCENDING, ReturnDocument
+
+from pdf_bulk import _pdf_filename, stream_zip, stream_merged_pdf
+from pdf_service import render_resume_pdf
+
+logger = logging.getLogger(__name__)
+
+EXPORT_JOB_WORKERS = int(os.environ.get("EXPORT_JOB_WORKERS", "1"))
+EXPORT_JOB_MAX_ATTEMPTS = int(os.environ.get("EXPORT_JOB_MAX_ATTEMPTS", "3"))
+# A running job whose lease lapses (crashed worker) is picked up again; live workers renew it
+EXPORT_JOB_LEASE_SECONDS = int(os.environ.get("EXPORT_JOB_LEASE_SECONDS", "600"))
+EXPORT_JOB_TTL_SECONDS = int(os.environ.get("EXPORT_JOB_TTL_SECONDS", "86400"))
+EXPORT_JOB_POLL_SECONDS = float(os.environ.get("EXPORT_JOB_POLL_SECONDS", "2"))
+
+TERMINAL_STATUSES = ("done", "failed")
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Set when this process queues a job so an idle worker starts without waiting for the poll
+_wakeup = asyncio.Event()
+
+
+class LeaseLost(Exception):
+    pass
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def submit_job(db, user_id: str, resume_ids: list, export_format: str) -> dict:
+    now = _now()
+    job = {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "resume_ids": resume_ids,
+        "format": export_format,
+        "status": "queued",
+        "attempts": 0,
+        "error": None,
+        "result_file_id": None,
+        "run_after": now,
+        "created_at": now,
+        "updated_at": now,
+        "expires_at": now + timedelta(seconds=EXPORT_JOB_TTL_SECONDS),
+    }
+    await db.export_jobs.insert_one(job)
+    job.pop("_id", None)
+    _wakeup.set()
+    return job
+
+
+async def get_job(db, job_id: str, user_id: str) -> Optional[dict]:
+    return await db.export_jobs.find_one({"id": job_id, "user_id": user_id}, {"_id": 0})
+
+
+async def wait_for_job(db, job_id: str, user_id: str, timeout: float) -> Optional[dict]:
+    """Poll until the job reaches a terminal state or ``timeout`` seconds pass."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await get_job(db, job_id, user_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return job
+        if asyncio.get_running_loop().time() >= deadline:
+            return job
+        await asyncio.sleep(0.5)
+
+
+def _lease_filter(job: dict) -> dict:
+    # lease_id tells apart workers in the same process, which share WORKER_ID
+    return {"id": job["id"], "worker_id": WORKER_ID, "lease_id": job["lease_id"]}
+
+
+async def claim_job(db) -> Optional[dict]:
+    now = _now()
+    return await db.export_jobs.find_one_and_update(
+        {"$or": [
+            {"status": "queued", "run_after": {"$lte": now}},
+            # A job that keeps killing its worker must not be retried forever
+            {"status": "running", "lease_expires_at": {"$lt": now}, "attempts": {"$lt": EXPORT_JOB_MAX_ATTEMPTS}},
+        ]},
+        {
+            "$set": {
+                "status": "running",
+                "worker_id": WORKER_ID,
+                "lease_id": uuid.uuid4().hex,
+                "lease_expires_at": now + timedelta(seconds=EXPORT_JOB_LEASE_SECONDS),
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("created_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def fail_abandoned_jobs(db):
+    """Fail running jobs whose lease lapsed on their last allowed attempt."""
+    now = _now()
+    result = await db.export_jobs.update_many(
+        {"status": "running", "lease_expires_at": {"$lt": now}, "attempts": {"$gte": EXPORT_JOB_MAX_ATTEMPTS}},
+        {"$set": {"status": "failed", "error": "Export worker stopped responding", "finished_at": now, "updated_at": now}},
+    )
+    if result.modified_count:
+        logger.warning(f"Failed {result.modified_count} export jobs abandoned by their workers")
+
+
+async def _keep_lease(db, job: dict, lost: asyncio.Event):
+    """Renew the job's lease until cancelled; sets ``lost`` if another worker has taken it."""
+    while True:
+        await asyncio.sleep(EXPORT_JOB_LEASE_SECONDS / 3)
+        try:
+            result = await db.export_jobs.update_one(
+                _lease_filter(job),
+                {"$set": {"lease_expires_at": _now() + timedelta(seconds=EXPORT_JOB_LEASE_SECONDS)}},
+            )
+        except Exception as e:
+            logger.warning(f"Could not renew lease on export job {job['id']}: {e}")
+            continue
+        if not result.matched_count:
+            lost.set()
+            return
+
+
+async def _produce(db, job: dict):
+    """Return ``(filename, content_type, chunk_iterator)`` for the job's output."""
+    query = {"user_id": job["user_id"], "id": {"$in": job["resume_ids"]}}
+
+    if job["format"] == "pdf" and len(job["resume_ids"]) == 1:
+        resume = await db.resumes.find_one(query, {"_id": 0})
+        if not resume:
+            raise ValueError("Resume no longer exists")
+        pdf_bytes, _ = await render_resume_pdf(resume)
+
+        async def single():
+            yield pdf_bytes
+        return _pdf_filename(resume, set()), "application/pdf", single()
+
+    cursor = db.resumes.find(query, {"_id": 0}).sort("updated_at", -1)
+    if job["format"] == "pdf":
+        return "resumes.pdf", "application/pdf", stream_merged_pdf(cursor)
+    return "resumes.zip", "application/zip", stream_zip(cursor)
+
+
+async def run_job(db, job: dict):
+    lost = asyncio.Event()
+    renewer = asyncio.create_task(_keep_lease(db, job, lost))
+    try:
+        fs = AsyncIOMotorGridFSBucket(db, bucket_name="exports")
+        filename, content_type, chunks = await _produce(db, job)
+        # Stream straight into GridFS so large archives never sit in memory
+        upload = fs.open_upload_stream(
+            filename, metadata={"job_id": job["id"], "user_id": job["user_id"], "content_type": content_type}
+        )
+        try:
+            async for chunk in chunks:
+                if lost.is_set():
+                    raise LeaseLost()
+                if chunk:
+                    await upload.write(chunk)
+        except BaseException:
+            await upload.abort()
+            raise
+        await upload.close()
+
+        now = _now()
+        result = await db.export_jobs.update_one(_lease_filter(job), {"$set": {
+            "status": "done",
+            "error": None,
+            "result_file_id": upload._id,
+            "filename": filename,
+            "content_type": content_type,
+            "finished_at": now,
+            "updated_at": now,
+            "expires_at": now + timedelta(seconds=EXPORT_JOB_TTL_SECONDS),
+        }})
+        if not result.matched_count:
+            # Another worker owns the job now; its output is the one that counts
+            logger.warning(f"Lost the lease on export job {job['id']} before finishing; discarding the result")
+            await fs.delete(upload._id)
+    except asyncio.CancelledError:
+        raise
+    except LeaseLost:
+        logger.warning(f"Lost the lease on export job {job['id']}; leaving it to the new owner")
+    except Exception as e:
+        logger.exception(f"Export job {job['id']} failed (attempt {job['attempts']})")
+        now = _now()
+        if job["attempts"] >= EXPORT_JOB_MAX_ATTEMPTS:
+            update = {"status": "failed", "error": str(e) or type(e).__name__, "finished_at": now}
+        else:
+            # Exponential backoff before the next attempt
+            update = {
+                "status": "queued",
+                "error": str(e) or type(e).__name__,
+                "run_after": now + timedelta(seconds=5 * 2 ** (job["attempts"] - 1)),
+            }
+        # If this write fails too, the lease lapses and the job is picked up again
+        await db.export_jobs.update_one(_lease_filter(job), {"$set": {**update, "updated_at": now}})
+    finally:
+        renewer.cancel()
+
+
+async def open_result(db, job: dict):
+    fs = AsyncIOMotorGridFSBucket(db, bucket_name="exports")
+    return await fs.open_download_stream(job["result_file_id"])
+
+
+async def purge_expired_jobs(db):
+    fs = AsyncIOMotorGridFSBucket(db, bucket_name="exports")
+    async for job in db.export_jobs.find({"expires_at": {"$lt": _now()}}, {"_id": 0, "id": 1, "result_file_id": 1}):
+        if job.get("result_file_id") is not None:
+            try:
+                await fs.delete(job["result_file_id"])
+            except Exception as e:
+                logger.warning(f"Could not delete export file for job {job['id']}: {e}")
+        await db.export_jobs.delete_one({"id": job["id"]})
+
+
+async def export_worker(db):
+    """Claim and run jobs until cancelled; idle workers poll every EXPORT_JOB_POLL_SECONDS."""
+    while True:
+        try:
+            job = await claim_job(db)
+        except Exception:
+            logger.exception("Could not claim export job")
+            job = None
+
+        if job is None:
+            try:
+                await fail_abandoned_jobs(db)
+            except Exception:
+                logger.exception("Could not fail abandoned export jobs")
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), EXPORT_JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        try:
+            await run_job(db, job)
+        except Exception:
+            # Keep the worker alive; the job's lease lapses and another attempt follows
+            logger.exception(f"Export worker could not finish job {job['id']}")
+
+
+async def export_janitor(db, interval: float = 300):
+    while True:
+        try:
+            await purge_expired_jobs(db)
+        except Exception:
+            logger.exception("Export job cleanup failed")
+        await asyncio.sleep(interval)
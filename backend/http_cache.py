@@ -0,0 +1,83 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Optional
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of ``etag`` against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+def not_modified(
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+    etag: str,
+    last_modified: Optional[datetime] = None,
+) -> bool:
+    """Whether a conditional GET can be answered with 304.
+
+    If-Modified-Since is only consulted when If-None-Match is absent, and only
+    at the one-second precision of HTTP dates.
+    """
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def digest_etag(*parts) -> str:
+    """Strong ETag for a value with no stored version, from a hash of its parts."""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def version_etag(version: int, ats_score: Optional[float] = None) -> str:
+    """ETag for a stored resume; the score can refresh without a new version, so it is part of the tag."""
+    if ats_score is None:
+        return f'"v{version or 0}"'
+    return f'"v{version or 0}-{ats_score:g}"'
+
+
+def if_match_versions(if_match: Optional[str]) -> Optional[List[int]]:
+    """Document versions named by an If-Match header, or None when any version will do.
+
+    Unrecognised tags match nothing. Only the version part of a tag counts, so
+    a score refresh does not fail the save. Version tags also match in their
+    weak form: they name the stored document, and only compression weakens them.
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    versions = []
+    for candidate in if_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.startswith('"v') and candidate.endswith('"'):
+            version = candidate[2:-1].split("-", 1)[0]
+            if version.isdigit():
+                versions.append(int(version))
+    return versions
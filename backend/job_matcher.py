@@ -0,0 +1,130 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, List
+
+from ats_engine import SECTIONS, section_text
+from keyword_dictionary import get_keyword_index
+
+# Bump when tokenization changes so stored resume terms get rebuilt
+TERMS_VERSION = 1
+
+MAX_NGRAM = 3
+MAX_JOB_TERMS = 60
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-/][a-z0-9+#]+)*")
+
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can
+could do does for from has have having he her his how i if in into is it its just may
+me more most must my no not of on or our over own per she should so some such than that
+the their them then there these they this those through to under up us using very via
+was we were what when where which while who will with within would you your
+ability able experience including etc work working role team year years strong good
+need needs plus key looking seeking join ideal candidate candidates preferred required
+requirements responsibilities responsible knowledge skills familiarity understanding
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def extract_terms(text: str, max_ngram: int = MAX_NGRAM) -> Counter:
+    """Count unigrams and n-grams (up to ``max_ngram`` words) that do not start or end on a stopword."""
+    tokens = tokenize(text)
+    terms = Counter()
+    for n in range(1, max_ngram + 1):
+        for i in range(len(tokens) - n + 1):
+            first, last = tokens[i], tokens[i + n - 1]
+            if first in STOPWORDS or last in STOPWORDS or first.isdigit() or last.isdigit():
+                continue
+            terms[" ".join(tokens[i:i + n])] += 1
+    return terms
+
+
+def job_description_terms(job_description: str, limit: int = MAX_JOB_TERMS) -> Dict[str, float]:
+    """Weighted terms for a job description, highest weight first.
+
+    Repeated terms, longer phrases and terms from the ATS keyword
+    dictionaries weigh more.
+    """
+    known_terms = get_keyword_index().term_positions
+    weights = {}
+    for term, count in extract_terms(job_description).items():
+        words = term.count(" ") + 1
+        if words > 1 and count < 2 and term not in known_terms:
+            # One-off phrases are mostly noise; keep only repeated or known ones
+            continue
+        weight = count * (1 + 0.5 * (words - 1))
+        if term in known_terms:
+            weight *= 2
+        weights[term] = weight
+    top = sorted(weights.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return dict(top)
+
+
+def resume_terms(resume: dict) -> List[str]:
+    text = " ".join(section_text(section, resume.get(section)) for section in SECTIONS)
+    return sorted(extract_terms(text))
+
+
+def match_terms(job_terms: Dict[str, float], matched: Iterable[str]) -> dict:
+    matched = set(matched)
+    total = sum(job_terms.values())
+    matched_weight = sum(weight for term, weight in job_terms.items() if term in matched)
+    return {
+        "score": round(matched_weight / total * 100) if total else 0,
+        "matched_terms": [term for term in job_terms if term in matched],
+        "missing_terms": [term for term in job_terms if term not in matched][:20],
+    }
+
+
+# Inverted index: one document per resume holding its distinct terms, with a
+# multikey index on (user_id, terms) so ranking only touches matching resumes
+
+async def index_resume(db, resume: dict):
+    await db.resume_terms.update_one(
+        {"resume_id": resume["id"]},
+        {"$set": {
+            "resume_id": resume["id"],
+            "user_id": resume["user_id"],
+            "title": resume.get("title", ""),
+            "terms": resume_terms(resume),
+        }},
+        upsert=True,
+    )
+
+
+async def unindex_resume(db, resume_id: str):
+    await db.resume_terms.delete_one({"resume_id": resume_id})
+
+
+async def rank_resumes(db, user_id: str, job_terms: Dict[str, float], resume_id: str = None,
+                       limit: int = 20) -> List[dict]:
+    query = {"user_id": user_id, "terms": {"$in": list(job_terms)}}
+    if resume_id:
+        query["resume_id"] = resume_id
+
+    cursor = db.resume_terms.aggregate([
+        {"$match": query},
+        {"$project": {
+            "_id": 0,
+            "resume_id": 1,
+            "title": 1,
+            "matched": {"$setIntersection": ["$terms", list(job_terms)]},
+        }},
+    ])
+
+    results = []
+    async for doc in cursor:
+        results.append({"resume_id": doc["resume_id"], "title": doc["title"], **match_terms(job_terms, doc["matched"])})
+    results.sort(key=lambda r: -r["score"])
+    return results[:limit]
+
+
+async def backfill_resume_terms(db):
+    """Index resumes created before the index existed or with an older TERMS_VERSION."""
+    cursor = db.resumes.find({"terms_version": {"$ne": TERMS_VERSION}}, {"_id": 0})
+    async for resume in cursor:
+        await index_resume(db, resume)
+        await db.resumes.update_one({"id": resume["id"]}, {"$set": {"terms_version": TERMS_VERSION}})
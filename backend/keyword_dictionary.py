@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from keyword_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_DIR = Path(os.environ.get("ATS_KEYWORD_DIR", Path(__file__).parent / "keywords"))
+KEYWORD_CACHE_DIR = Path(os.environ.get("ATS_KEYWORD_CACHE_DIR", KEYWORD_DIR / ".compiled"))
+
+# Bump when the pickled index layout changes so stale caches are ignored
+INDEX_FORMAT_VERSION = 2
+
+
+class KeywordIndex:
+    """Immutable, compiled view of every keyword dictionary on disk.
+
+    ``terms`` holds the canonical keywords ordered by weight (highest first,
+    file order otherwise); synonyms are folded into the matcher and map back
+    onto their canonical term.
+    """
+
+    def __init__(self, version: str, terms: List[str], weights: List[float],
+                 term_sets: List[str], surfaces: List[Tuple[str, int]]):
+        self.version = version
+        self.terms = terms
+        self.weights = weights
+        self.term_sets = term_sets
+        self.term_positions = {term: i for i, term in enumerate(terms)}
+        self.total_weight = sum(weights)
+        self.matcher = KeywordMatcher(surface for surface, _ in surfaces)
+        # The matcher dedupes surfaces, so map through its own keyword list
+        surface_term = dict(surfaces)
+        self._surface_term = [surface_term[keyword] for keyword in self.matcher.keywords]
+
+    def find_terms(self, text: str) -> Set[int]:
+        """Return the indexes (into ``terms``) of every canonical term found in ``text``."""
+        surface_term = self._surface_term
+        return {surface_term[index] for index in self.matcher.find(text)}
+
+    def count_terms(self, text: str) -> Dict[int, int]:
+        """Occurrence counts per canonical term index, with synonyms folded in."""
+        counts: Dict[int, int] = {}
+        surface_term = self._surface_term
+        for index, n in self.matcher.count(text).items():
+            term = surface_term[index]
+            counts[term] = counts.get(term, 0) + n
+        return counts
+
+
+def _read_dictionaries(keyword_dir: Path) -> List[dict]:
+    dictionaries = []
+    for path in sorted(keyword_dir.glob("*.json")):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        data.setdefault("name", path.stem)
+        dictionaries.append(data)
+    dictionaries.sort(key=lambda d: (d.get("order", 0), d["name"]))
+    return dictionaries
+
+
+def _compile(dictionaries: List[dict], version: str) -> KeywordIndex:
+    entries = []
+    seen = set()
+    for dictionary in dictionaries:
+        for entry in dictionary.get("terms", []):
+            if isinstance(entry, str):
+                entry = {"term": entry}
+            term = entry["term"].lower().strip()
+            if not term or term in seen:
+                continue
+            seen.add(term)
+            entries.append((
+                term,
+                float(entry.get("weight", dictionary.get("weight", 1.0))),
+                dictionary["name"],
+                [s.lower().strip() for s in entry.get("synonyms", [])],
+            ))
+
+    # Stable sort keeps file order among equally weighted terms
+    entries.sort(key=lambda e: -e[1])
+
+    surfaces = []
+    for index, (term, _, _, synonyms) in enumerate(entries):
+        surfaces.append((term, index))
+        surfaces.extend((synonym, index) for synonym in synonyms if synonym)
+
+    return KeywordIndex(
+        version=version,
+        terms=[e[0] for e in entries],
+        weights=[e[1] for e in entries],
+        term_sets=[e[2] for e in entries],
+        surfaces=surfaces,
+    )
+
+
+def _source_signature(keyword_dir: Path) -> Tuple:
+    signature = []
+    for path in sorted(keyword_dir.glob("*.json")):
+        stat = path.stat()
+        signature.append((path.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def _source_digest(keyword_dir: Path) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(keyword_dir.glob("*.json")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _load_compiled(cache_path: Path) -> Optional[KeywordIndex]:
+    try:
+        with open(cache_path, "rb") as f:
+            format_version, index = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable keyword index {cache_path}: {e}")
+        return None
+    if format_version != INDEX_FORMAT_VERSION:
+        return None
+    return index
+
+
+def _store_compiled(cache_path: Path, index: KeywordIndex):
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump((INDEX_FORMAT_VERSION, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not write keyword index cache {cache_path}: {e}")
+
+
+def build_keyword_index(keyword_dir: Path = KEYWORD_DIR, cache_dir: Path = KEYWORD_CACHE_DIR) -> KeywordIndex:
+    """Load the compiled index for ``keyword_dir``, compiling and caching it if needed."""
+    version = _source_digest(keyword_dir)
+    cache_path = cache_dir / f"keywords-{version}.pickle"
+
+    index = _load_compiled(cache_path)
+    if index is None:
+        index = _compile(_read_dictionaries(keyword_dir), version)
+        _store_compiled(cache_path, index)
+        logger.info(f"Compiled keyword index {version} ({len(index.terms)} terms)")
+    return index
+
+
+# Active index; replaced wholesale on reload so readers never see a partial swap
+_active_index: Optional[KeywordIndex] = None
+_active_signature: Optional[Tuple] = None
+_reload_lock = threading.Lock()
+
+
+def get_keyword_index() -> KeywordIndex:
+    if _active_index is None:
+        reload_keyword_index()
+    return _active_index
+
+
+def reload_keyword_index(force: bool = False) -> bool:
+    """Swap in a fresh index if the dictionary files changed. Returns True on swap."""
+    global _active_index, _active_signature
+
+    with _reload_lock:
+        signature = _source_signature(KEYWORD_DIR)
+        if not force and _active_index is not None and signature == _active_signature:
+            return False
+
+        index = build_keyword_index()
+        previous = _active_index.version if _active_index is not None else None
+        _active_index, _active_signature = index, signature
+
+    if previous is not None and previous != index.version:
+        logger.info(f"Keyword index reloaded: {previous} -> {index.version}")
+    return True
+
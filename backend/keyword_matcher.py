@@ -0,0 +1,94 @@
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Set
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over lowercased keywords.
+
+    Built once and reused; ``find`` walks the text a single time and reports
+    every keyword that occurs on word boundaries, so "java" is not found
+    inside "javascript" and overlapping phrases ("data analysis" and
+    "analysis") are both reported.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        seen = {}
+        for keyword in keywords:
+            keyword = keyword.lower().strip()
+            if not keyword or keyword in seen:
+                continue
+            seen[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+            self._insert(keyword, seen[keyword])
+
+        self._build_failure_links()
+
+    def _insert(self, keyword: str, index: int):
+        node = 0
+        for ch in keyword:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = next_node
+        self._out[node].append(index)
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[int]:
+        """Yield the index (into ``self.keywords``) of every keyword occurrence in ``text``.
+
+        ``text`` is expected to be lowercased already.
+        """
+        goto, fail, out, keywords = self._goto, self._fail, self._out, self.keywords
+        text_len = len(text)
+        node = 0
+        for pos, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = pos + 1
+            if end < text_len and _is_word_char(text[end]):
+                continue
+            for index in out[node]:
+                start = end - len(keywords[index])
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    yield index
+
+    def find(self, text: str) -> Set[int]:
+        """Return the indexes of the distinct keywords found in ``text``."""
+        return set(self.iter_matches(text))
+
+    def count(self, text: str) -> Counter:
+        """Return occurrence counts per keyword index for ``text``."""
+        return Counter(self.iter_matches(text))
+
+    def find_keywords(self, text: str) -> Set[str]:
+        return {self.keywords[index] for index in self.find(text)}
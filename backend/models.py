@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import List, Optional
+from typing import Any, List, Literal, Optional
 from datetime import datetime, timezone
 import uuid
 
@@ -103,6 +103,8 @@ class ResumeResponse(BaseModel):
     projects: List[Project]
     certifications: List[Certification]
     ats_score: int
+    # Incremented on every write; sent back as the ETag for If-Match updates
+    version: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -110,3 +112,75 @@ class ATSScoreResponse(BaseModel):
     score: int
     suggestions: List[str]
     missing_keywords: List[str]
+
+class ATSBatchRequest(BaseModel):
+    # Score the given documents, or the caller's stored resumes by ID
+    # (all of them when neither field is set)
+    resume_ids: Optional[List[str]] = None
+    resumes: Optional[List[ResumeCreate]] = None
+    persist: bool = True
+    # "vector" scores whole chunks with NumPy and returns score, coverage and
+    # similarity without suggestions
+    mode: Literal["full", "vector"] = "full"
+
+class JobMatchRequest(BaseModel):
+    job_description: str
+    # Score a single resume instead of ranking all of the caller's resumes
+    resume_id: Optional[str] = None
+    limit: int = Field(default=20, ge=1, le=100)
+
+class JobMatchResult(BaseModel):
+    resume_id: str
+    title: str
+    score: int
+    matched_terms: List[str]
+    missing_terms: List[str]
+
+class JobMatchResponse(BaseModel):
+    terms: List[str]
+    results: List[JobMatchResult]
+
+class BulkExportRequest(BaseModel):
+    # Export these resumes, or all of the caller's resumes when omitted
+    resume_ids: Optional[List[str]] = None
+    format: Literal["zip", "pdf"] = "zip"
+
+class ExportJobResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    id: str
+    status: Literal["queued", "running", "done", "failed"]
+    format: Literal["zip", "pdf"]
+    resume_count: int
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    expires_at: datetime
+
+class ChangePasswordRequest(BaseModel):
+    current_password: str
+    new_password: str
+
+class ResumeSummary(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    id: str
+    title: str
+    template_id: str
+    ats_score: int
+    version: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+class ResumePatchOperation(BaseModel):
+    op: Literal["add", "remove", "replace", "move"]
+    # JSON Pointer; items in work_experience, education, projects and
+    # certifications are addressed by id, e.g. /work_experience/<id>/description/0
+    path: str
+    value: Any = None
+    # Insert (add) or destination (move) index; add appends when omitted
+    position: Optional[int] = None
+
+class ResumePatch(BaseModel):
+    operations: List[ResumePatchOperation] = Field(min_length=1, max_length=200)
@@ -0,0 +1,31 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from serialization import as_datetime
+
+
+def encode_cursor(updated_at: datetime, resume_id: str) -> str:
+    """Opaque keyset cursor for the ``(updated_at, id)`` sort key of the last item on a page."""
+    raw = json.dumps([as_datetime(updated_at).isoformat(), resume_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, str]]:
+    """Return ``(updated_at, id)``, or None when the cursor is malformed."""
+    try:
+        updated_at, resume_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(updated_at, str) or not isinstance(resume_id, str):
+            return None
+        return as_datetime(updated_at), resume_id
+    except (ValueError, TypeError):
+        return None
+
+
+def after_cursor(updated_at: datetime, resume_id: str) -> dict:
+    """Filter for documents after the cursor in ``updated_at`` desc, ``id`` desc order."""
+    return {"$or": [
+        {"updated_at": {"$lt": updated_at}},
+        {"updated_at": updated_at, "id": {"$lt": resume_id}},
+    ]}
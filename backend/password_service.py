@@ -0,0 +1,101 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from auth import hash_password, verify_and_update_password
+from metrics import password_duration
+
+# bcrypt releases the GIL, so threads give real parallelism without hogging the loop
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+
+class PasswordQueueFull(Exception):
+    pass
+
+
+class PasswordService:
+    """Runs bcrypt hashing and verification on a dedicated, bounded thread pool.
+
+    At most ``workers`` operations run at once and at most ``max_queue``
+    wait; beyond that calls raise ``PasswordQueueFull`` so a login storm
+    sheds load instead of queueing unboundedly.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.hashes = 0
+        self.verifications = 0
+        self.rehashes = 0
+        self.completed = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._slots = asyncio.Semaphore(workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, operation: str, fn, *args):
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise PasswordQueueFull()
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.completed += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+            password_duration.observe(elapsed, operation=operation)
+            self.in_flight -= 1
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        self.hashes += 1
+        return await self._run("hash", hash_password, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        self.verifications += 1
+        valid, new_hash = await self._run("verify", verify_and_update_password, password, hashed)
+        if new_hash:
+            self.rehashes += 1
+        return valid, new_hash
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "hashes": self.hashes,
+            "verifications": self.verifications,
+            "rehashes": self.rehashes,
+            "avg_seconds": self.total_seconds / self.completed if self.completed else 0.0,
+            "max_seconds": self.max_seconds,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_service = PasswordService()
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import os
+import re
+import tempfile
+import time
+import zipfile
+from io import BytesIO
+from typing import AsyncIterator, Dict, Iterable, List, Tuple, Union
+
+from PyPDF2 import PdfReader, PdfWriter
+
+from pdf_service import pdf_service, render_resume_pdf, RenderQueueFull, RenderTimeout
+
+logger = logging.getLogger(__name__)
+
+MAX_BULK_EXPORT = int(os.environ.get("PDF_BULK_EXPORT_MAX", "500"))
+# How long a bulk export keeps retrying a render while the pool is saturated
+BULK_QUEUE_RETRY_SECONDS = float(os.environ.get("PDF_BULK_QUEUE_RETRY_SECONDS", "60"))
+
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+async def _render_with_retry(resume: Dict) -> bytes:
+    deadline = time.monotonic() + BULK_QUEUE_RETRY_SECONDS
+    while True:
+        try:
+            pdf_bytes, _ = await render_resume_pdf(resume)
+            return pdf_bytes
+        except RenderQueueFull:
+            # Bulk exports yield to interactive exports instead of failing
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.5)
+
+
+async def render_many(resumes: Union[Iterable, AsyncIterator], window: int = None
+                      ) -> AsyncIterator[Tuple[int, Dict, Union[bytes, Exception]]]:
+    """Render resumes concurrently, yielding ``(position, resume, pdf_or_error)`` as each finishes.
+
+    Only ``window`` renders are outstanding at a time (the render pool size by
+    default), so input is pulled lazily and finished PDFs are handed on
+    immediately rather than accumulated.
+    """
+    window = window or pdf_service.workers
+
+    async def run(position, resume):
+        try:
+            return position, resume, await _render_with_retry(resume)
+        except (RenderQueueFull, RenderTimeout) as e:
+            return position, resume, e
+        except Exception as e:
+            # Headers and earlier entries are already sent, so report it in the output instead
+            logger.exception(f"Bulk export could not render resume {resume.get('id')}")
+            return position, resume, e
+
+    async def source():
+        if hasattr(resumes, "__aiter__"):
+            async for resume in resumes:
+                yield resume
+        else:
+            for resume in resumes:
+                yield resume
+
+    pending = set()
+    position = 0
+    try:
+        async for resume in source():
+            pending.add(asyncio.ensure_future(run(position, resume)))
+            position += 1
+            if len(pending) >= window:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _pdf_filename(resume: Dict, used: set) -> str:
+    base = re.sub(r"[^\w.-]+", "_", resume.get("title") or "resume").strip("_") or "resume"
+    name = f"{base}.pdf"
+    n = 2
+    while name in used:
+        name = f"{base}-{n}.pdf"
+        n += 1
+    used.add(name)
+    return name
+
+
+class _ZipSink:
+    """Write-only, unseekable file object; zipfile then emits data descriptors."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_zip(resumes: Union[Iterable, AsyncIterator]) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive of rendered resumes, one entry per finished render.
+
+    Entries are written in completion order and flushed straight to the
+    client; PDFs are already compressed, so they are stored uncompressed.
+    Failed renders are listed in ``errors.txt`` at the end.
+    """
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+    used_names = set()
+    errors = []
+
+    async for _, resume, result in render_many(resumes):
+        if isinstance(result, Exception):
+            errors.append(f"{resume.get('title', '')} ({resume['id']}): {type(result).__name__}")
+            continue
+        info = zipfile.ZipInfo(_pdf_filename(resume, used_names), date_time=time.localtime()[:6])
+        archive.writestr(info, result)
+        yield sink.drain()
+
+    if errors:
+        archive.writestr("errors.txt", "Could not render:\n" + "\n".join(errors) + "\n")
+    archive.close()
+    yield sink.drain()
+
+
+async def stream_merged_pdf(resumes: Union[Iterable, AsyncIterator]) -> AsyncIterator[bytes]:
+    """Yield one PDF containing every resume, in input order.
+
+    Rendering is still parallel, but a merged PDF can only be written once
+    every page is known, so the output is assembled in a spooled temporary
+    file (spilling to disk past 16 MB) and streamed from there. Resumes
+    that fail to render are skipped.
+    """
+    writer = PdfWriter()
+    rendered = {}
+    next_position = 0
+
+    async for position, _, result in render_many(resumes):
+        rendered[position] = result
+        while next_position in rendered:
+            pdf_bytes = rendered.pop(next_position)
+            if not isinstance(pdf_bytes, Exception):
+                reader = await asyncio.to_thread(PdfReader, BytesIO(pdf_bytes))
+                for page in reader.pages:
+                    writer.add_page(page)
+            next_position += 1
+
+    with tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024) as output:
+        await asyncio.to_thread(writer.write, output)
+        output.seek(0)
+        while chunk := await asyncio.to_thread(output.read, _STREAM_CHUNK_SIZE):
+            yield chunk
+
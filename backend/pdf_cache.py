@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from pdf_generator import RENDERER_VERSION
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_DIR = Path(os.environ.get("PDF_CACHE_DIR", Path(tempfile.gettempdir()) / "resume-pdf-cache"))
+PDF_CACHE_MAX_BYTES = int(os.environ.get("PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Everything generate_pdf draws from; the filename-only title is left out
+PDF_CONTENT_FIELDS = (
+    "personal_info", "professional_summary", "skills", "work_experience",
+    "education", "projects", "certifications",
+)
+
+
+def pdf_cache_key(resume: dict, template_id: str) -> str:
+    content = json.dumps(
+        {field: resume.get(field) for field in PDF_CONTENT_FIELDS},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(f"{RENDERER_VERSION}:{template_id}:{content}".encode()).hexdigest()
+
+
+class PDFCache:
+    """Rendered PDFs on the local filesystem, one file per resume and content key.
+
+    Files are named ``<resume_id>-<key>.pdf`` so a resume's entries can be
+    dropped together. When the directory grows past ``max_bytes`` the least
+    recently used files (by mtime, refreshed on every hit) are evicted.
+    """
+
+    def __init__(self, directory: Path = PDF_CACHE_DIR, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, resume_id: str, key: str) -> Path:
+        return self.directory / f"{resume_id}-{key}.pdf"
+
+    def get(self, resume_id: str, key: str) -> Optional[bytes]:
+        path = self._path(resume_id, key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, resume_id: str, key: str, data: bytes):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Older renders of this resume can never be requested again
+            self.invalidate(resume_id)
+            path = self._path(resume_id, key)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache PDF for resume {resume_id}: {e}")
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def invalidate(self, resume_id: str):
+        for path in self.directory.glob(f"{resume_id}-*.pdf"):
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                if self._size is not None:
+                    self._size -= size
+
+    def _scan_size(self) -> int:
+        return sum(path.stat().st_size for path in self.directory.glob("*.pdf"))
+
+    def _evict(self):
+        # Rescan: other workers may share the directory
+        entries = []
+        for path in self.directory.glob("*.pdf"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        size = sum(entry[1] for entry in entries)
+        target = self.max_bytes * 0.9
+        for _, file_size, path in entries:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            size -= file_size
+        self._size = size
+
+
+pdf_cache = PDFCache()
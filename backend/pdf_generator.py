@@ -1,64 +1,174 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_LEFT, TA_CENTER
+from dataclasses import dataclass
 from io import BytesIO
 from typing import Dict
 
-def generate_pdf(resume_data: Dict, template_id: str = "ats-tech") -> BytesIO:
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-    
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Custom styles
-    name_style = ParagraphStyle(
-        'NameStyle',
-        parent=styles['Heading1'],
-        fontSize=20,
-        textColor=colors.HexColor('#0F172A'),
-        spaceAfter=6,
-        alignment=TA_CENTER
-    )
-    
-    contact_style = ParagraphStyle(
-        'ContactStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.HexColor('#64748B'),
-        alignment=TA_CENTER,
-        spaceAfter=12
-    )
-    
-    heading_style = ParagraphStyle(
-        'HeadingStyle',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#0F172A'),
-        spaceAfter=8,
-        spaceBefore=12,
-        borderWidth=0,
-        borderPadding=0,
-        borderColor=colors.HexColor('#CBD5E1'),
-        borderRadius=0
-    )
-    
+# Bump whenever layout or styling changes so cached PDFs are re-rendered
+RENDERER_VERSION = "2"
+
+DEFAULT_TEMPLATE_ID = "ats-tech"
+
+_SAMPLE_STYLES = getSampleStyleSheet()
+
+@dataclass(frozen=True)
+class PDFTemplate:
+    """Styles and layout for one resume template, built once at import."""
+    name_style: ParagraphStyle
+    contact_style: ParagraphStyle
+    heading_style: ParagraphStyle
+    body_style: ParagraphStyle
+    meta_style: ParagraphStyle
+    margin: float
+    heading_rule_color: object = None
+    bullet: str = "•"
+    skills_separator: str = " • "
+
+def _build_template(
+    template_id: str,
+    font: str,
+    bold_font: str,
+    name_size: int,
+    name_color: str,
+    heading_color: str,
+    body_color: str,
+    muted_color: str,
+    name_alignment: int = TA_CENTER,
+    margin: float = 0.5 * inch,
+    heading_rule_color: str = None,
+    bullet: str = "•",
+    skills_separator: str = " • "
+) -> PDFTemplate:
+    styles = _SAMPLE_STYLES
+    prefix = template_id.replace('-', '_')
+
     body_style = ParagraphStyle(
-        'BodyStyle',
+        f'{prefix}_Body',
         parent=styles['Normal'],
+        fontName=font,
         fontSize=10,
-        textColor=colors.HexColor('#334155'),
+        textColor=colors.HexColor(body_color),
         spaceAfter=6,
         leading=14
     )
-    
+
+    return PDFTemplate(
+        name_style=ParagraphStyle(
+            f'{prefix}_Name',
+            parent=styles['Heading1'],
+            fontName=bold_font,
+            fontSize=name_size,
+            leading=name_size + 4,
+            textColor=colors.HexColor(name_color),
+            spaceAfter=6,
+            alignment=name_alignment
+        ),
+        contact_style=ParagraphStyle(
+            f'{prefix}_Contact',
+            parent=styles['Normal'],
+            fontName=font,
+            fontSize=10,
+            textColor=colors.HexColor(muted_color),
+            alignment=name_alignment,
+            spaceAfter=12
+        ),
+        heading_style=ParagraphStyle(
+            f'{prefix}_Heading',
+            parent=styles['Heading2'],
+            fontName=bold_font,
+            fontSize=14,
+            textColor=colors.HexColor(heading_color),
+            spaceAfter=8,
+            spaceBefore=12
+        ),
+        body_style=body_style,
+        meta_style=ParagraphStyle(
+            f'{prefix}_Meta',
+            parent=body_style,
+            fontSize=9,
+            textColor=colors.HexColor(muted_color)
+        ),
+        margin=margin,
+        heading_rule_color=colors.HexColor(heading_rule_color) if heading_rule_color else None,
+        bullet=bullet,
+        skills_separator=skills_separator
+    )
+
+TEMPLATES = {
+    "ats-tech": _build_template(
+        "ats-tech",
+        font='Helvetica',
+        bold_font='Helvetica-Bold',
+        name_size=20,
+        name_color='#0F172A',
+        heading_color='#0F172A',
+        body_color='#334155',
+        muted_color='#64748B'
+    ),
+    "business-pro": _build_template(
+        "business-pro",
+        font='Times-Roman',
+        bold_font='Times-Bold',
+        name_size=22,
+        name_color='#1E3A5F',
+        heading_color='#1E3A5F',
+        body_color='#1F2937',
+        muted_color='#4B5563',
+        name_alignment=TA_LEFT,
+        margin=0.75 * inch,
+        heading_rule_color='#1E3A5F',
+        skills_separator=' | '
+    ),
+    "creative-bold": _build_template(
+        "creative-bold",
+        font='Helvetica',
+        bold_font='Helvetica-Bold',
+        name_size=26,
+        name_color='#7C3AED',
+        heading_color='#DB2777',
+        body_color='#1F2937',
+        muted_color='#6B7280',
+        heading_rule_color='#F9A8D4',
+        bullet='–'
+    ),
+}
+
+def get_template(template_id: str) -> PDFTemplate:
+    return TEMPLATES.get(template_id) or TEMPLATES[DEFAULT_TEMPLATE_ID]
+
+def generate_pdf(resume_data: Dict, template_id: str = DEFAULT_TEMPLATE_ID) -> BytesIO:
+    template = get_template(template_id)
+    name_style = template.name_style
+    contact_style = template.contact_style
+    heading_style = template.heading_style
+    body_style = template.body_style
+    meta_style = template.meta_style
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        topMargin=0.5*inch,
+        bottomMargin=0.5*inch,
+        leftMargin=template.margin,
+        rightMargin=template.margin
+    )
+
+    story = []
+
+    def add_heading(text):
+        story.append(Paragraph(text, heading_style))
+        if template.heading_rule_color is not None:
+            story.append(HRFlowable(width="100%", thickness=1, color=template.heading_rule_color, spaceAfter=6))
+
     # Personal Info
     personal_info = resume_data.get('personal_info', {})
     story.append(Paragraph(personal_info.get('full_name', ''), name_style))
-    
+
     contact_parts = []
     if personal_info.get('email'):
         contact_parts.append(personal_info['email'])
@@ -66,105 +176,106 @@ def generate_pdf(resume_data: Dict, template_id: str = "ats-tech") -> BytesIO:
         contact_parts.append(personal_info['phone'])
     if personal_info.get('location'):
         contact_parts.append(personal_info['location'])
-    
+
     if contact_parts:
         story.append(Paragraph(' | '.join(contact_parts), contact_style))
-    
+
     link_parts = []
     if personal_info.get('linkedin'):
         link_parts.append(f"LinkedIn: {personal_info['linkedin']}")
     if personal_info.get('portfolio'):
         link_parts.append(f"Portfolio: {personal_info['portfolio']}")
-    
+
     if link_parts:
         story.append(Paragraph(' | '.join(link_parts), contact_style))
-    
+
     story.append(Spacer(1, 0.2*inch))
-    
+
     # Professional Summary
     if resume_data.get('professional_summary'):
-        story.append(Paragraph('PROFESSIONAL SUMMARY', heading_style))
+        add_heading('PROFESSIONAL SUMMARY')
         story.append(Paragraph(resume_data['professional_summary'], body_style))
         story.append(Spacer(1, 0.1*inch))
-    
+
     # Skills
     if resume_data.get('skills'):
-        story.append(Paragraph('SKILLS', heading_style))
-        skills_text = ' • '.join(resume_data['skills'])
+        add_heading('SKILLS')
+        skills_text = template.skills_separator.join(resume_data['skills'])
         story.append(Paragraph(skills_text, body_style))
         story.append(Spacer(1, 0.1*inch))
-    
+
     # Work Experience
     if resume_data.get('work_experience'):
-        story.append(Paragraph('WORK EXPERIENCE', heading_style))
+        add_heading('WORK EXPERIENCE')
         for exp in resume_data['work_experience']:
             # Company and Position
             exp_header = f"<b>{exp.get('position', '')}</b> | {exp.get('company', '')}"
             if exp.get('location'):
                 exp_header += f" | {exp['location']}"
             story.append(Paragraph(exp_header, body_style))
-            
+
             # Dates
             date_range = f"{exp.get('start_date', '')} - {exp.get('end_date', 'Present') if not exp.get('current') else 'Present'}"
-            date_style = ParagraphStyle('DateStyle', parent=body_style, fontSize=9, textColor=colors.HexColor('#64748B'))
-            story.append(Paragraph(date_range, date_style))
-            
+            story.append(Paragraph(date_range, meta_style))
+
             # Description bullets
             for desc in exp.get('description', []):
-                bullet = f"• {desc}"
+                bullet = f"{template.bullet} {desc}"
                 story.append(Paragraph(bullet, body_style))
-            
+
             story.append(Spacer(1, 0.1*inch))
-    
+
     # Education
     if resume_data.get('education'):
-        story.append(Paragraph('EDUCATION', heading_style))
+        add_heading('EDUCATION')
         for edu in resume_data['education']:
             edu_header = f"<b>{edu.get('degree', '')}</b>"
             if edu.get('field'):
                 edu_header += f" in {edu['field']}"
             story.append(Paragraph(edu_header, body_style))
-            
+
             edu_details = edu.get('institution', '')
             if edu.get('location'):
                 edu_details += f" | {edu['location']}"
             story.append(Paragraph(edu_details, body_style))
-            
+
             date_range = f"{edu.get('start_date', '')} - {edu.get('end_date', '')}"
             if edu.get('gpa'):
                 date_range += f" | GPA: {edu['gpa']}"
-            date_style = ParagraphStyle('DateStyle', parent=body_style, fontSize=9, textColor=colors.HexColor('#64748B'))
-            story.append(Paragraph(date_range, date_style))
+            story.append(Paragraph(date_range, meta_style))
             story.append(Spacer(1, 0.1*inch))
-    
+
     # Projects
     if resume_data.get('projects'):
-        story.append(Paragraph('PROJECTS', heading_style))
+        add_heading('PROJECTS')
         for proj in resume_data['projects']:
             proj_header = f"<b>{proj.get('name', '')}</b>"
             if proj.get('link'):
                 proj_header += f" | {proj['link']}"
             story.append(Paragraph(proj_header, body_style))
-            
+
             story.append(Paragraph(proj.get('description', ''), body_style))
-            
+
             if proj.get('technologies'):
                 tech_text = 'Technologies: ' + ', '.join(proj['technologies'])
-                tech_style = ParagraphStyle('TechStyle', parent=body_style, fontSize=9, textColor=colors.HexColor('#64748B'))
-                story.append(Paragraph(tech_text, tech_style))
-            
+                story.append(Paragraph(tech_text, meta_style))
+
             story.append(Spacer(1, 0.1*inch))
-    
+
     # Certifications
     if resume_data.get('certifications'):
-        story.append(Paragraph('CERTIFICATIONS', heading_style))
+        add_heading('CERTIFICATIONS')
         for cert in resume_data['certifications']:
             cert_text = f"<b>{cert.get('name', '')}</b> | {cert.get('issuer', '')} | {cert.get('date', '')}"
             if cert.get('credential_id'):
                 cert_text += f" | ID: {cert['credential_id']}"
             story.append(Paragraph(cert_text, body_style))
             story.append(Spacer(1, 0.05*inch))
-    
+
     doc.build(story)
     buffer.seek(0)
     return buffer
+
+def render_pdf(resume_data: Dict, template_id: str = DEFAULT_TEMPLATE_ID) -> bytes:
+    """``generate_pdf`` returning raw bytes, so it can run in a worker process."""
+    return generate_pdf(resume_data, template_id).getvalue()
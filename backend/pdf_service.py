@@ -0,0 +1,112 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from metrics import pdf_render_duration
+from pdf_cache import pdf_cache, pdf_cache_key
+from pdf_generator import DEFAULT_TEMPLATE_ID, render_pdf
+
+PDF_RENDER_WORKERS = int(os.environ.get("PDF_RENDER_WORKERS", str(os.cpu_count() or 1)))
+# "process" keeps ReportLab's CPU work off the GIL; "thread" avoids worker startup
+PDF_RENDER_EXECUTOR = os.environ.get("PDF_RENDER_EXECUTOR", "process")
+PDF_RENDER_MAX_QUEUE = int(os.environ.get("PDF_RENDER_MAX_QUEUE", "32"))
+PDF_RENDER_TIMEOUT = float(os.environ.get("PDF_RENDER_TIMEOUT", "30"))
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+class RenderTimeout(Exception):
+    pass
+
+
+class PDFRenderService:
+    """Renders PDFs on a worker pool with bounded concurrency and queueing.
+
+    At most ``workers`` renders run at once and at most ``max_queue`` wait
+    for a slot; beyond that ``render`` raises ``RenderQueueFull`` straight
+    away so callers can shed load instead of piling up requests.
+    """
+
+    def __init__(self, workers: int = PDF_RENDER_WORKERS, max_queue: int = PDF_RENDER_MAX_QUEUE,
+                 timeout: float = PDF_RENDER_TIMEOUT, executor_type: str = PDF_RENDER_EXECUTOR):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.executor_type = executor_type
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._slots = asyncio.Semaphore(workers)
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdf-render")
+            else:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+        return self._executor
+
+    def _release(self, _future):
+        self.in_flight -= 1
+        self._slots.release()
+
+    async def render(self, resume: Dict, template_id: str = DEFAULT_TEMPLATE_ID) -> bytes:
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise RenderQueueFull()
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            future = asyncio.wrap_future(self._get_executor().submit(render_pdf, resume, template_id))
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(lambda _: pdf_render_duration.observe(time.perf_counter() - started))
+        # The slot is held until the worker really finishes, even after a
+        # timeout, so a stuck render keeps counting against the limit
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise RenderTimeout()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pdf_service = PDFRenderService()
+
+
+async def render_resume_pdf(resume: Dict) -> Tuple[bytes, str]:
+    """Return ``(pdf_bytes, cache_key)`` for a stored resume, rendering only on a cache miss.
+
+    Raises ``RenderQueueFull`` / ``RenderTimeout`` from the render service.
+    """
+    template_id = resume.get("template_id", DEFAULT_TEMPLATE_ID)
+    cache_key = pdf_cache_key(resume, template_id)
+
+    pdf_bytes = await asyncio.to_thread(pdf_cache.get, resume["id"], cache_key)
+    if pdf_bytes is None:
+        pdf_bytes = await pdf_service.render(resume, template_id)
+        await asyncio.to_thread(pdf_cache.put, resume["id"], cache_key, pdf_bytes)
+    return pdf_bytes, cache_key
@@ -0,0 +1,254 @@
+import copy
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from models import Certification, Education, PersonalInfo, Project, WorkExperience
+
+# Item collections addressed by each item's ``id``
+ITEM_MODELS = {
+    "work_experience": WorkExperience,
+    "education": Education,
+    "projects": Project,
+    "certifications": Certification,
+}
+SCALAR_FIELDS = ("title", "template_id", "professional_summary")
+PATCHABLE_FIELDS = (*SCALAR_FIELDS, "personal_info", "skills", *ITEM_MODELS)
+
+_STR = TypeAdapter(str)
+
+
+class InvalidPatch(ValueError):
+    pass
+
+
+class PatchTargetNotFound(LookupError):
+    pass
+
+
+@dataclass
+class PatchPlan:
+    # New value of every top-level field the patch touches
+    fields: Dict[str, Any]
+    update: Dict[str, dict]
+    array_filters: List[dict] = field(default_factory=list)
+
+
+def parse_path(path: str) -> List[str]:
+    """Split a JSON Pointer such as ``/work_experience/<id>/description/0``."""
+    if not path.startswith("/"):
+        raise InvalidPatch(f"Path must start with '/': {path}")
+    return [segment.replace("~1", "/").replace("~0", "~") for segment in path[1:].split("/")]
+
+
+def touched_fields(operations) -> Set[str]:
+    fields = set()
+    for operation in operations:
+        name = parse_path(operation.path)[0]
+        if name not in PATCHABLE_FIELDS:
+            raise InvalidPatch(f"Unknown field: {name}")
+        fields.add(name)
+    return fields
+
+
+def _index(segment: str, size: int) -> int:
+    if not segment.isdigit() or int(segment) >= size:
+        raise PatchTargetNotFound(f"No element at index {segment}")
+    return int(segment)
+
+
+def _position(position: Optional[int], size: int) -> Optional[int]:
+    if position is None or position == size:
+        return None
+    if not 0 <= position <= size:
+        raise InvalidPatch(f"Position {position} is out of range")
+    return position
+
+
+def _validate(adapter: TypeAdapter, value):
+    try:
+        return adapter.validate_python(value)
+    except ValidationError as e:
+        raise InvalidPatch(str(e)) from e
+
+
+def _validate_item(model, value) -> dict:
+    try:
+        return model.model_validate(value).model_dump()
+    except ValidationError as e:
+        raise InvalidPatch(str(e)) from e
+
+
+class _Planner:
+    def __init__(self, document: dict, fields: Set[str]):
+        self.values = {name: copy.deepcopy(document.get(name)) for name in fields}
+        # (operator, path, value, top-level field)
+        self.targeted: List[Tuple[str, str, Any, str]] = []
+        self.array_filters: Dict[str, dict] = {}
+        self.fallback: Set[str] = set()
+
+    def _filter(self, name: str, item_id: str) -> str:
+        for identifier, array_filter in self.array_filters.items():
+            if array_filter == {f"{identifier}.id": item_id}:
+                return identifier
+        identifier = f"i{len(self.array_filters)}"
+        self.array_filters[identifier] = {f"{identifier}.id": item_id}
+        return identifier
+
+    def _push(self, path: str, value, position: Optional[int], name: str):
+        spec = {"$each": [value]}
+        if position is not None:
+            spec["$position"] = position
+        self.targeted.append(("$push", path, spec, name))
+
+    def _list(self, values: list, path: str, segments: List[str], operation, name: str):
+        """``add``/``replace``/``remove`` on a list of strings (skills, bullets, technologies)."""
+        if not segments:
+            if operation.op != "add":
+                raise InvalidPatch(f"Unsupported operation {operation.op} on {operation.path}")
+            value = _validate(_STR, operation.value)
+            position = _position(operation.position, len(values))
+            values.insert(len(values) if position is None else position, value)
+            self._push(path, value, position, name)
+            return
+
+        if len(segments) != 1:
+            raise InvalidPatch(f"Invalid path: {operation.path}")
+        index = _index(segments[0], len(values))
+        if operation.op == "replace":
+            values[index] = _validate(_STR, operation.value)
+            self.targeted.append(("$set", f"{path}.{index}", values[index], name))
+        elif operation.op == "remove":
+            # MongoDB cannot remove by index in one step; rewrite the section
+            del values[index]
+            self.fallback.add(name)
+        else:
+            raise InvalidPatch(f"Unsupported operation {operation.op} on {operation.path}")
+
+    def apply(self, operation):
+        name, *rest = parse_path(operation.path)
+        values = self.values
+
+        if name in SCALAR_FIELDS:
+            if rest or operation.op != "replace":
+                raise InvalidPatch(f"Only replace is supported on {operation.path}")
+            values[name] = _validate(_STR, operation.value)
+            self.targeted.append(("$set", name, values[name], name))
+
+        elif name == "personal_info":
+            if operation.op != "replace" or len(rest) > 1:
+                raise InvalidPatch(f"Only replace is supported on {operation.path}")
+            if not rest:
+                values[name] = _validate_item(PersonalInfo, operation.value)
+                self.targeted.append(("$set", name, values[name], name))
+            else:
+                if rest[0] not in PersonalInfo.model_fields:
+                    raise InvalidPatch(f"Unknown field: {operation.path}")
+                if values[name] is None:
+                    raise PatchTargetNotFound("Resume has no personal info")
+                values[name][rest[0]] = _validate(_STR, operation.value)
+                self.targeted.append(("$set", f"{name}.{rest[0]}", values[name][rest[0]], name))
+
+        elif name == "skills":
+            if values[name] is None:
+                values[name] = []
+            self._list(values[name], name, rest, operation, name)
+
+        else:
+            self._apply_item(name, rest, operation)
+
+    def _apply_item(self, name: str, rest: List[str], operation):
+        model = ITEM_MODELS[name]
+        items = self.values[name]
+        if items is None:
+            items = self.values[name] = []
+
+        if not rest:
+            if operation.op != "add":
+                raise InvalidPatch(f"Unsupported operation {operation.op} on {operation.path}")
+            item = _validate_item(model, operation.value)
+            if any(existing.get("id") == item["id"] for existing in items):
+                raise InvalidPatch(f"Duplicate id {item['id']} in {name}")
+            position = _position(operation.position, len(items))
+            items.insert(len(items) if position is None else position, item)
+            self._push(name, item, position, name)
+            return
+
+        item_id, *rest = rest
+        index = next((i for i, item in enumerate(items) if item.get("id") == item_id), None)
+        if index is None:
+            raise PatchTargetNotFound(f"No item {item_id} in {name}")
+        item_path = f"{name}.$[{self._filter(name, item_id)}]"
+
+        if not rest:
+            if operation.op == "remove":
+                del items[index]
+                self.targeted.append(("$pull", name, {"id": item_id}, name))
+            elif operation.op == "replace":
+                items[index] = _validate_item(model, {**(operation.value or {}), "id": item_id})
+                self.targeted.append(("$set", item_path, items[index], name))
+            elif operation.op == "move":
+                if operation.position is None or not 0 <= operation.position < len(items):
+                    raise InvalidPatch("move needs a position within the list")
+                items.insert(operation.position, items.pop(index))
+                self.fallback.add(name)
+            else:
+                raise InvalidPatch(f"Unsupported operation {operation.op} on {operation.path}")
+            return
+
+        attribute, *rest = rest
+        annotation = model.model_fields.get(attribute)
+        if annotation is None or attribute == "id":
+            raise InvalidPatch(f"Unknown field: {operation.path}")
+        item = items[index]
+
+        if annotation.annotation == List[str]:
+            if operation.op == "replace" and not rest:
+                item[attribute] = _validate(TypeAdapter(List[str]), operation.value)
+                self.targeted.append(("$set", f"{item_path}.{attribute}", item[attribute], name))
+            else:
+                item.setdefault(attribute, [])
+                self._list(item[attribute], f"{item_path}.{attribute}", rest, operation, name)
+            return
+
+        if rest or operation.op != "replace":
+            raise InvalidPatch(f"Only replace is supported on {operation.path}")
+        item[attribute] = _validate(TypeAdapter(annotation.annotation), operation.value)
+        self.targeted.append(("$set", f"{item_path}.{attribute}", item[attribute], name))
+
+    def plan(self) -> PatchPlan:
+        # MongoDB rejects one update touching a path and its prefix (or the same
+        # path twice), so such fields are rewritten whole instead
+        for i, (_, path, _, name) in enumerate(self.targeted):
+            for _, other, _, other_name in self.targeted[i + 1:]:
+                if name == other_name and (path == other or path.startswith(other + ".") or other.startswith(path + ".")):
+                    self.fallback.add(name)
+
+        update: Dict[str, dict] = {}
+        used_filters = set()
+        for operator, path, value, name in self.targeted:
+            if name in self.fallback:
+                continue
+            update.setdefault(operator, {})[path] = value
+            used_filters.update(identifier for identifier in self.array_filters if f"$[{identifier}]" in path)
+        for name in self.fallback:
+            update.setdefault("$set", {})[name] = self.values[name]
+
+        return PatchPlan(
+            fields=self.values,
+            update=update,
+            array_filters=[self.array_filters[identifier] for identifier in sorted(used_filters)],
+        )
+
+
+def plan_patch(document: dict, operations) -> PatchPlan:
+    """Apply ``operations`` to ``document`` and build the equivalent targeted MongoDB update.
+
+    Raises ``InvalidPatch`` for malformed operations and ``PatchTargetNotFound``
+    when an addressed item or index does not exist in ``document``.
+    """
+    planner = _Planner(document, touched_fields(operations))
+    for operation in operations:
+        planner.apply(operation)
+    return planner.plan()
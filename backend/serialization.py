@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+from typing import Any, Union
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# Same wire format FastAPI produces for aware datetimes ("...Z")
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson and no model validation.
+
+    Only for documents read from our own collections with a projection that
+    already matches the response model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=_ORJSON_OPTIONS)
+
+
+def as_datetime(value: Union[datetime, str]) -> datetime:
+    """Datetime from a BSON date or a legacy ISO string, always timezone-aware."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
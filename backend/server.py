@@ -1,29 +1,63 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne, ReturnDocument
 import os
+import json
+import asyncio
 import logging
+import hmac
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
 from datetime import datetime, timezone
 import uuid
 
 from models import (
-    UserCreate, UserResponse, LoginRequest, LoginResponse,
-    ResumeCreate, ResumeUpdate, ResumeResponse, ATSScoreResponse
+    UserCreate, UserResponse, LoginRequest, LoginResponse, ChangePasswordRequest,
+    ResumeCreate, ResumeUpdate, ResumeResponse, ResumeSummary, ATSScoreResponse, ATSBatchRequest,
+    JobMatchRequest, JobMatchResponse, BulkExportRequest, ExportJobResponse, ResumePatch
 )
-from auth import hash_password, verify_password, create_access_token, decode_token
-from ats_engine import calculate_ats_score
-from pdf_generator import generate_pdf
+from auth import create_user_token, AUTH_STATELESS
+from password_service import password_service, PasswordQueueFull
+from user_cache import decode_token_cached, get_user, invalidate_user, user_cache, token_cache
+from token_revocation import revocations, watch_revocations
+from db_indexes import prepare_indexes
+from ats_cache import score_resume, score_cache, SCORING_PROJECTION
+from ats_batch import ascore_batch, shutdown_executor, BATCH_CHUNK_SIZE, MAX_BATCH_SIZE
+from ats_engine import SECTIONS
+from job_matcher import (
+    TERMS_VERSION, job_description_terms, index_resume, unindex_resume, rank_resumes,
+    backfill_resume_terms
+)
+from keyword_dictionary import get_keyword_index, reload_keyword_index
+from pdf_service import pdf_service, render_resume_pdf, RenderQueueFull, RenderTimeout
+from pdf_cache import pdf_cache, pdf_cache_key
+from pdf_bulk import stream_zip, stream_merged_pdf, MAX_BULK_EXPORT
+from http_cache import etag_matches, not_modified, http_date, digest_etag, version_etag, if_match_versions
+from pagination import encode_cursor, decode_cursor, after_cursor
+from resume_patch import plan_patch, touched_fields, InvalidPatch, PatchTargetNotFound
+from export_jobs import (
+    submit_job, get_job, wait_for_job, open_result, export_worker, export_janitor,
+    EXPORT_JOB_WORKERS
+)
+from serialization import FastJSONResponse, as_datetime
+from db_migrations import migrate_iso_dates, migrate_user_resume_dates
+from compression import CompressionMiddleware
+from metrics import (
+    registry, register_callback, mongo_command_metrics, monitor_event_loop_lag, MetricsMiddleware,
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS_TOKEN
+)
+from diagnostics import LoopWatchdog, ProfilerMiddleware, LOOP_BLOCK_THRESHOLD, PROFILING_ENABLED
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# tz_aware so stored dates come back as UTC datetimes
+client = AsyncIOMotorClient(mongo_url, tz_aware=True, event_listeners=[mongo_command_metrics])
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
@@ -33,24 +67,50 @@ app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 # Auth dependency
-async def get_current_user(authorization: Optional[str] = Header(None)) -> dict:
+async def get_token_payload(authorization: Optional[str] = Header(None)) -> dict:
     if not authorization or not authorization.startswith('Bearer '):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     
     token = authorization.replace('Bearer ', '')
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    user_id = payload.get('sub')
-    if not user_id:
+    if not payload.get('sub'):
         raise HTTPException(status_code=401, detail="Invalid token payload")
     
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    if revocations.is_revoked(payload):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    
+    return payload
+
+async def get_current_user(payload: dict = Depends(get_token_payload)) -> dict:
+    user_id = payload['sub']
+    
+    # Stateless tokens carry the profile, so no database read is needed
+    if AUTH_STATELESS and 'email' in payload:
+        return {
+            "id": user_id,
+            "email": payload['email'],
+            "full_name": payload['name'],
+            "created_at": payload['created_at']
+        }
+    
+    user = await get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
+    if payload.get('ver', 0) > user.get('token_version', 0):
+        # Newer than the cached user: another process bumped the version after we cached it
+        await invalidate_user(user_id)
+        user = await get_user(db, user_id)
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+    
+    if payload.get('ver', 0) != user.get('token_version', 0):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    
     return user
 
 # Auth Routes
@@ -62,25 +122,31 @@ async def signup(user_data: UserCreate):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create user
+    try:
+        password_hash = await password_service.hash(user_data.password)
+    except PasswordQueueFull:
+        raise HTTPException(status_code=503, detail="Server busy, please retry shortly", headers={"Retry-After": "2"})
+    
     user_id = str(uuid.uuid4())
+    created_at = datetime.now(timezone.utc)
     user_doc = {
         "id": user_id,
         "email": user_data.email,
-        "password_hash": hash_password(user_data.password),
+        "password_hash": password_hash,
         "full_name": user_data.full_name,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": created_at
     }
     
     await db.users.insert_one(user_doc)
     
     # Generate token
-    token = create_access_token({"sub": user_id})
+    token = create_user_token(user_doc)
     
     user_response = UserResponse(
         id=user_id,
         email=user_data.email,
         full_name=user_data.full_name,
-        created_at=datetime.now(timezone.utc)
+        created_at=created_at
     )
     
     return LoginResponse(token=token, user=user_response)
@@ -93,17 +159,28 @@ async def login(login_data: LoginRequest):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     # Verify password
-    if not verify_password(login_data.password, user['password_hash']):
+    try:
+        valid, new_hash = await password_service.verify_and_update(login_data.password, user['password_hash'])
+    except PasswordQueueFull:
+        raise HTTPException(status_code=503, detail="Server busy, please retry shortly", headers={"Retry-After": "2"})
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
+    # Upgrade hashes made with outdated parameters; skipped if it changed meanwhile
+    if new_hash:
+        await db.users.update_one(
+            {"id": user['id'], "password_hash": user['password_hash']},
+            {"$set": {"password_hash": new_hash}}
+        )
+    
     # Generate token
-    token = create_access_token({"sub": user['id']})
+    token = create_user_token(user)
     
     user_response = UserResponse(
         id=user['id'],
         email=user['email'],
         full_name=user['full_name'],
-        created_at=datetime.fromisoformat(user['created_at'])
+        created_at=as_datetime(user['created_at'])
     )
     
     return LoginResponse(token=token, user=user_response)
@@ -114,90 +191,341 @@ async def get_me(current_user: dict = Depends(get_current_user)):
         id=current_user['id'],
         email=current_user['email'],
         full_name=current_user['full_name'],
-        created_at=datetime.fromisoformat(current_user['created_at'])
+        created_at=as_datetime(current_user['created_at'])
     )
 
+@api_router.post("/auth/logout")
+async def logout(payload: dict = Depends(get_token_payload)):
+    if await revocations.revoke_token(db, payload):
+        # Every session was signed out, so cached token versions are stale
+        await invalidate_user(payload['sub'])
+    return {"message": "Logged out successfully"}
+
+@api_router.post("/auth/change-password", response_model=LoginResponse)
+async def change_password(password_data: ChangePasswordRequest, current_user: dict = Depends(get_current_user)):
+    user = await db.users.find_one({"id": current_user['id']}, {"_id": 0})
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    
+    try:
+        valid, _ = await password_service.verify_and_update(password_data.current_password, user['password_hash'])
+        if not valid:
+            raise HTTPException(status_code=400, detail="Current password is incorrect")
+        password_hash = await password_service.hash(password_data.new_password)
+    except PasswordQueueFull:
+        raise HTTPException(status_code=503, detail="Server busy, please retry shortly", headers={"Retry-After": "2"})
+    
+    # Bumping the token version signs out every other session
+    user['token_version'] = await revocations.bump_token_version(db, user['id'], {"password_hash": password_hash})
+    await invalidate_user(user['id'])
+    
+    user_response = UserResponse(
+        id=user['id'],
+        email=user['email'],
+        full_name=user['full_name'],
+        created_at=as_datetime(user['created_at'])
+    )
+    
+    return LoginResponse(token=create_user_token(user), user=user_response)
+
 # Resume Routes
+# Stored alongside each resume for scoring and matching, never returned
+RESUME_INTERNAL_FIELDS = ("ats_result", "ats_sections", "ats_fingerprint", "ats_keywords_version", "terms_version")
+RESUME_PROJECTION = {"_id": 0, **{field: 0 for field in RESUME_INTERNAL_FIELDS}}
+RESUME_SUMMARY_PROJECTION = {
+    "_id": 0, "id": 1, "title": 1, "template_id": 1, "ats_score": 1, "version": 1, "created_at": 1, "updated_at": 1
+}
+# Enough to answer a conditional GET without loading the resume itself
+RESUME_VALIDATOR_PROJECTION = {"_id": 0, "id": 1, "version": 1, "ats_score": 1, "updated_at": 1}
+
+def _resume_validators(resume: dict) -> dict:
+    # The ETag doubles as the If-Match token for updates, which only compares its
+    # version; the score is in it because dictionary refreshes do not bump the version.
+    return {
+        "ETag": version_etag(resume.get('version', 0), resume.get('ats_score')),
+        "Last-Modified": http_date(as_datetime(resume['updated_at'])),
+        "Cache-Control": "private, no-cache"
+    }
+
+def _page_validators(resumes: list, limit: int, view: str) -> dict:
+    """ETag and next cursor for a page fetched with ``limit + 1`` rows.
+
+    Lists carry no Last-Modified: a deletion changes the page without moving
+    any ``updated_at``.
+    """
+    page = resumes[:limit]
+    headers = {"Cache-Control": "private, no-cache"}
+    if len(resumes) > limit:
+        headers["X-Next-Cursor"] = encode_cursor(page[-1]['updated_at'], page[-1]['id'])
+    headers["ETag"] = digest_etag(
+        view,
+        headers.get("X-Next-Cursor"),
+        [(resume['id'], resume.get('version', 0), resume.get('ats_score')) for resume in page]
+    )
+    return headers
+
 @api_router.post("/resumes", response_model=ResumeResponse)
-async def create_resume(resume_data: ResumeCreate, current_user: dict = Depends(get_current_user)):
+async def create_resume(resume_data: ResumeCreate, response: Response, current_user: dict = Depends(get_current_user)):
     resume_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
     
     # Calculate ATS score
     resume_dict = resume_data.model_dump()
-    ats_result = calculate_ats_score(resume_dict)
+    ats_fields = await score_resume(resume_dict)
     
     resume_doc = {
         "id": resume_id,
         "user_id": current_user['id'],
         **resume_dict,
-        "ats_score": ats_result['score'],
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        **ats_fields,
+        "terms_version": TERMS_VERSION,
+        "version": 1,
+        "created_at": now,
+        "updated_at": now
     }
     
     await db.resumes.insert_one(resume_doc)
+    await index_resume(db, resume_doc)
+    
+    response.headers["ETag"] = version_etag(1, ats_fields['ats_score'])
     
     return ResumeResponse(
         id=resume_id,
         user_id=current_user['id'],
         **resume_dict,
-        ats_score=ats_result['score'],
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc)
+        ats_score=ats_fields['ats_score'],
+        version=1,
+        created_at=now,
+        updated_at=now
     )
 
-@api_router.get("/resumes", response_model=List[ResumeResponse])
-async def get_resumes(current_user: dict = Depends(get_current_user)):
-    resumes = await db.resumes.find({"user_id": current_user['id']}, {"_id": 0}).to_list(1000)
+@api_router.get("/resumes", response_model=List[Union[ResumeResponse, ResumeSummary]])
+async def get_resumes(
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    view: Literal["full", "summary"] = "full",
+    current_user: dict = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
+    # Sorting and cursors need dates throughout, so finish this user's share of the migration first
+    if not app.state.date_migration.done():
+        await migrate_user_resume_dates(db, current_user['id'])
+    
+    # Newest first; pass X-Next-Cursor back as ``cursor`` for the next page
+    query = {"user_id": current_user['id']}
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query.update(after_cursor(*position))
+    
+    sort = [("updated_at", -1), ("id", -1)]
     
-    # Convert ISO strings to datetime
+    # Revalidate from the page's ids and versions before fetching the resumes themselves
+    if if_none_match:
+        page = await db.resumes.find(query, RESUME_VALIDATOR_PROJECTION).sort(sort).limit(limit + 1).to_list(limit + 1)
+        headers = _page_validators(page, limit, view)
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    
+    projection = RESUME_SUMMARY_PROJECTION if view == "summary" else RESUME_PROJECTION
+    resumes = await db.resumes.find(query, projection).sort(sort).limit(limit + 1).to_list(limit + 1)
+    
+    headers = _page_validators(resumes, limit, view)
+    resumes = resumes[:limit]
+    
+    # The projection already matches the response model, so skip re-validating every resume
     for resume in resumes:
-        resume['created_at'] = datetime.fromisoformat(resume['created_at'])
-        resume['updated_at'] = datetime.fromisoformat(resume['updated_at'])
+        resume.setdefault('version', 0)
     
-    return resumes
+    return FastJSONResponse(resumes, headers=headers)
 
 @api_router.get("/resumes/{resume_id}", response_model=ResumeResponse)
-async def get_resume(resume_id: str, current_user: dict = Depends(get_current_user)):
-    resume = await db.resumes.find_one({"id": resume_id, "user_id": current_user['id']}, {"_id": 0})
+async def get_resume(
+    resume_id: str,
+    current_user: dict = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
+):
+    query = {"id": resume_id, "user_id": current_user['id']}
+    
+    # Revalidation is the common case, so answer it before loading the whole resume
+    if if_none_match or if_modified_since:
+        current = await db.resumes.find_one(query, RESUME_VALIDATOR_PROJECTION)
+        if not current:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        headers = _resume_validators(current)
+        if not_modified(if_none_match, if_modified_since, headers["ETag"], as_datetime(current['updated_at'])):
+            return Response(status_code=304, headers=headers)
+    
+    resume = await db.resumes.find_one(query, RESUME_PROJECTION)
     
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    resume['created_at'] = datetime.fromisoformat(resume['created_at'])
-    resume['updated_at'] = datetime.fromisoformat(resume['updated_at'])
+    return _resume_response(resume)
+
+# Times a partial update is retried when another save lands between its read and write
+MAX_UPDATE_ATTEMPTS = 3
+
+def _version_filter(versions: List[int]) -> dict:
+    # Documents written before versioning have no field and count as version 0
+    return {"version": {"$in": [*versions, None] if 0 in versions else versions}}
+
+def _resume_response(resume: dict) -> FastJSONResponse:
+    # Documents read with RESUME_PROJECTION already match ResumeResponse
+    resume.setdefault('version', 0)
+    return FastJSONResponse(resume, headers=_resume_validators(resume))
+
+async def _after_resume_write(resume: dict, reindex_terms: bool):
+    # Keep the job-matching index in step with the searchable text
+    if reindex_terms:
+        await index_resume(db, resume)
     
-    return resume
+    await asyncio.to_thread(pdf_cache.invalidate, resume['id'])
 
-@api_router.put("/resumes/{resume_id}", response_model=ResumeResponse)
-async def update_resume(resume_id: str, resume_data: ResumeUpdate, current_user: dict = Depends(get_current_user)):
-    # Check if resume exists
-    existing_resume = await db.resumes.find_one({"id": resume_id, "user_id": current_user['id']}, {"_id": 0})
-    if not existing_resume:
+async def _raise_update_failure(query: dict, expected_versions: Optional[List[int]]):
+    """Explain why a conditional resume write matched nothing: 404, 412 or 409."""
+    current = await db.resumes.find_one(query, {"_id": 0, "version": 1, "ats_score": 1})
+    if not current:
         raise HTTPException(status_code=404, detail="Resume not found")
+    etag = version_etag(current.get('version', 0), current.get('ats_score'))
+    if expected_versions is not None and current.get('version', 0) not in expected_versions:
+        raise HTTPException(
+            status_code=412,
+            detail="Resume was changed by another save",
+            headers={"ETag": etag}
+        )
+    raise HTTPException(
+        status_code=409,
+        detail="Resume is being saved concurrently, please retry",
+        headers={"ETag": etag}
+    )
+
+@api_router.put("/resumes/{resume_id}", response_model=ResumeResponse)
+async def update_resume(
+    resume_id: str,
+    resume_data: ResumeUpdate,
+    current_user: dict = Depends(get_current_user),
+    if_match: Optional[str] = Header(None)
+):
+    query = {"id": resume_id, "user_id": current_user['id']}
+    
+    # With If-Match the save only applies to the version the client last saw
+    expected_versions = if_match_versions(if_match)
+    expected_filter = _version_filter(expected_versions) if expected_versions is not None else {}
     
     # Update only provided fields
     update_data = resume_data.model_dump(exclude_unset=True)
+    updated_resume = None
     
-    if update_data:
-        # Recalculate ATS score
-        merged_data = {**existing_resume, **update_data}
-        ats_result = calculate_ats_score(merged_data)
+    if not update_data:
+        updated_resume = await db.resumes.find_one({**query, **expected_filter}, RESUME_PROJECTION)
+    else:
+        changed_sections = [section for section in SECTIONS if section in update_data]
+        reindex_terms = 'title' in update_data or bool(changed_sections)
         
-        update_data['ats_score'] = ats_result['score']
-        update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
+        for _ in range(MAX_UPDATE_ATTEMPTS):
+            write_filter = {**query, **expected_filter}
+            set_fields = {**update_data, 'updated_at': datetime.now(timezone.utc)}
+            
+            # Recalculate ATS score only when a scored section changed
+            if len(changed_sections) == len(SECTIONS):
+                # Full saves carry every scored section, so nothing needs reading first
+                set_fields.update(await score_resume(update_data))
+            elif changed_sections:
+                # Read just the scoring inputs, then re-score only the sections that changed
+                previous = await db.resumes.find_one(write_filter, {**SCORING_PROJECTION, "version": 1})
+                if not previous:
+                    break
+                set_fields.update(await score_resume({**previous, **update_data}, previous=previous))
+                # The score is only valid if no other save lands in between
+                write_filter = {**query, **_version_filter([previous.get('version', 0)])}
+            
+            if reindex_terms:
+                set_fields['terms_version'] = TERMS_VERSION
+            
+            updated_resume = await db.resumes.find_one_and_update(
+                write_filter,
+                {"$set": set_fields, "$inc": {"version": 1}},
+                projection=RESUME_PROJECTION,
+                return_document=ReturnDocument.AFTER
+            )
+            
+            # Only a partial update that lost a race is worth retrying
+            if updated_resume or not changed_sections or len(changed_sections) == len(SECTIONS):
+                break
         
-        await db.resumes.update_one(
-            {"id": resume_id, "user_id": current_user['id']},
-            {"$set": update_data}
+        if updated_resume:
+            await _after_resume_write(updated_resume, reindex_terms)
+    
+    if not updated_resume:
+        await _raise_update_failure(query, expected_versions)
+    
+    return _resume_response(updated_resume)
+
+@api_router.patch("/resumes/{resume_id}", response_model=ResumeResponse)
+async def patch_resume(
+    resume_id: str,
+    patch: ResumePatch,
+    current_user: dict = Depends(get_current_user),
+    if_match: Optional[str] = Header(None)
+):
+    query = {"id": resume_id, "user_id": current_user['id']}
+    expected_versions = if_match_versions(if_match)
+    expected_filter = _version_filter(expected_versions) if expected_versions is not None else {}
+    
+    try:
+        fields = touched_fields(patch.operations)
+    except InvalidPatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    changed_sections = [section for section in SECTIONS if section in fields]
+    reindex_terms = 'title' in fields or bool(changed_sections)
+    
+    # Read only the touched fields (plus the scoring inputs when a scored section changes)
+    projection = {"_id": 0, "version": 1, "ats_score": 1, **{name: 1 for name in fields}}
+    if changed_sections:
+        projection.update(SCORING_PROJECTION)
+    
+    updated_resume = None
+    for _ in range(MAX_UPDATE_ATTEMPTS):
+        current = await db.resumes.find_one({**query, **expected_filter}, projection)
+        if not current:
+            break
+        
+        try:
+            plan = plan_patch(current, patch.operations)
+        except PatchTargetNotFound as e:
+            raise HTTPException(status_code=409, detail=str(e), headers={"ETag": version_etag(current.get('version', 0), current.get('ats_score'))})
+        except InvalidPatch as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        set_fields = plan.update.setdefault("$set", {})
+        set_fields['updated_at'] = datetime.now(timezone.utc)
+        if changed_sections:
+            set_fields.update(await score_resume({**current, **plan.fields}, previous=current))
+        if reindex_terms:
+            set_fields['terms_version'] = TERMS_VERSION
+        plan.update["$inc"] = {"version": 1}
+        
+        # Targeted operators assume the document read above, so apply them only to that version
+        updated_resume = await db.resumes.find_one_and_update(
+            {**query, **_version_filter([current.get('version', 0)])},
+            plan.update,
+            array_filters=plan.array_filters or None,
+            projection=RESUME_PROJECTION,
+            return_document=ReturnDocument.AFTER
         )
+        if updated_resume:
+            break
     
-    # Fetch updated resume
-    updated_resume = await db.resumes.find_one({"id": resume_id, "user_id": current_user['id']}, {"_id": 0})
-    updated_resume['created_at'] = datetime.fromisoformat(updated_resume['created_at'])
-    updated_resume['updated_at'] = datetime.fromisoformat(updated_resume['updated_at'])
+    if not updated_resume:
+        await _raise_update_failure(query, expected_versions)
     
-    return updated_resume
+    await _after_resume_write(updated_resume, reindex_terms)
+    
+    return _resume_response(updated_resume)
 
 @api_router.delete("/resumes/{resume_id}")
 async def delete_resume(resume_id: str, current_user: dict = Depends(get_current_user)):
@@ -206,10 +534,13 @@ async def delete_resume(resume_id: str, current_user: dict = Depends(get_current
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Resume not found")
     
+    await unindex_resume(db, resume_id)
+    await asyncio.to_thread(pdf_cache.invalidate, resume_id)
+    
     return {"message": "Resume deleted successfully"}
 
 @api_router.post("/resumes/{resume_id}/duplicate", response_model=ResumeResponse)
-async def duplicate_resume(resume_id: str, current_user: dict = Depends(get_current_user)):
+async def duplicate_resume(resume_id: str, response: Response, current_user: dict = Depends(get_current_user)):
     # Find original resume
     original = await db.resumes.find_one({"id": resume_id, "user_id": current_user['id']}, {"_id": 0})
     
@@ -221,24 +552,52 @@ async def duplicate_resume(resume_id: str, current_user: dict = Depends(get_curr
     duplicate = {**original}
     duplicate['id'] = new_id
     duplicate['title'] = f"{original['title']} (Copy)"
-    duplicate['created_at'] = datetime.now(timezone.utc).isoformat()
-    duplicate['updated_at'] = datetime.now(timezone.utc).isoformat()
+    duplicate['version'] = 1
+    duplicate['created_at'] = duplicate['updated_at'] = datetime.now(timezone.utc)
     
     await db.resumes.insert_one(duplicate)
-    
-    duplicate['created_at'] = datetime.fromisoformat(duplicate['created_at'])
-    duplicate['updated_at'] = datetime.fromisoformat(duplicate['updated_at'])
+    await index_resume(db, duplicate)
+    response.headers["ETag"] = version_etag(1, duplicate.get('ats_score'))
     
     return duplicate
 
 @api_router.get("/resumes/{resume_id}/ats-score", response_model=ATSScoreResponse)
-async def get_ats_score(resume_id: str, current_user: dict = Depends(get_current_user)):
-    resume = await db.resumes.find_one({"id": resume_id, "user_id": current_user['id']}, {"_id": 0})
+async def get_ats_score(
+    resume_id: str,
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
+    query = {"id": resume_id, "user_id": current_user['id']}
+    
+    # The score fingerprint covers the scored sections and the keyword dictionary
+    # version, so a stored one identifies the result while its dictionary is current
+    if if_none_match:
+        stored = await db.resumes.find_one(query, {"_id": 0, "ats_fingerprint": 1, "ats_keywords_version": 1})
+        if not stored:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        if stored.get('ats_fingerprint') and stored.get('ats_keywords_version') == get_keyword_index().version:
+            etag = f'"{stored["ats_fingerprint"]}"'
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    
+    resume = await db.resumes.find_one(query, {**SCORING_PROJECTION, "version": 1})
     
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    ats_result = calculate_ats_score(resume)
+    ats_fields = await score_resume(resume)
+    ats_result = ats_fields['ats_result']
+    response.headers["ETag"] = f'"{ats_fields["ats_fingerprint"]}"'
+    response.headers["Cache-Control"] = "private, no-cache"
+    
+    # Persist the result when the stored one is missing or stale (e.g. after a dictionary change).
+    # A save that landed since the read already stored the score of its newer sections.
+    if ats_fields['ats_fingerprint'] != resume.get('ats_fingerprint'):
+        await db.resumes.update_one(
+            {**query, **_version_filter([resume.get('version', 0)])},
+            {"$set": ats_fields}
+        )
     
     return ATSScoreResponse(
         score=ats_result['score'],
@@ -246,66 +605,329 @@ async def get_ats_score(resume_id: str, current_user: dict = Depends(get_current
         missing_keywords=ats_result['missing_keywords']
     )
 
+@api_router.post("/ats/batch")
+async def batch_ats_score(batch: ATSBatchRequest, current_user: dict = Depends(get_current_user)):
+    requested = batch.resumes if batch.resumes is not None else batch.resume_ids
+    if requested is not None and len(requested) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} resumes per batch")
+    
+    if batch.resumes is not None:
+        key_field = "index"
+        items = ((i, resume.model_dump()) for i, resume in enumerate(batch.resumes))
+    else:
+        key_field = "id"
+        query = {"user_id": current_user['id']}
+        if batch.resume_ids is not None:
+            query["id"] = {"$in": batch.resume_ids}
+        projection = {"_id": 0, "id": 1, "version": 1, **{section: 1 for section in SECTIONS}}
+        cursor = db.resumes.find(query, projection)
+        versions = {}
+        
+        async def stored_resumes():
+            async for doc in cursor:
+                versions[doc['id']] = doc.get('version', 0)
+                yield doc['id'], doc
+        
+        items = stored_resumes()
+    
+    # Stream one JSON line per resume as each chunk finishes scoring
+    async def stream_results():
+        scored = set()
+        writes = []
+        async for key, result in ascore_batch(items, mode=batch.mode):
+            if batch.mode == "full":
+                stored_fields, result = result, result['ats_result']
+            else:
+                # Vector scores match the full score, so refresh just that; the
+                # full result is recomputed on the next ats-score request
+                stored_fields = {"ats_score": result['score']}
+            
+            if key_field == "id":
+                scored.add(key)
+                if batch.persist:
+                    # Only over the version that was scored; a newer save has its own score
+                    writes.append(UpdateOne(
+                        {"id": key, "user_id": current_user['id'], **_version_filter([versions[key]])},
+                        {"$set": stored_fields}
+                    ))
+                    if len(writes) >= BATCH_CHUNK_SIZE:
+                        await db.resumes.bulk_write(writes, ordered=False)
+                        writes = []
+            yield json.dumps({key_field: key, **result}) + "\n"
+        
+        if writes:
+            await db.resumes.bulk_write(writes, ordered=False)
+        
+        for resume_id in batch.resume_ids or []:
+            if resume_id not in scored:
+                yield json.dumps({"id": resume_id, "error": "Resume not found"}) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@api_router.post("/jobs/match", response_model=JobMatchResponse)
+async def match_job_description(match_data: JobMatchRequest, current_user: dict = Depends(get_current_user)):
+    job_terms = job_description_terms(match_data.job_description)
+    if not job_terms:
+        raise HTTPException(status_code=400, detail="Job description has no usable terms")
+    
+    results = await rank_resumes(
+        db, current_user['id'], job_terms,
+        resume_id=match_data.resume_id, limit=match_data.limit
+    )
+    
+    if match_data.resume_id and not results:
+        resume = await db.resumes.find_one(
+            {"id": match_data.resume_id, "user_id": current_user['id']},
+            {"_id": 0, "id": 1, "title": 1}
+        )
+        if not resume:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        results = [{
+            "resume_id": resume['id'],
+            "title": resume['title'],
+            "score": 0,
+            "matched_terms": [],
+            "missing_terms": list(job_terms)[:20]
+        }]
+    
+    return JobMatchResponse(terms=list(job_terms), results=results)
+
+@api_router.post("/resumes/export")
+async def bulk_export(export_data: BulkExportRequest, current_user: dict = Depends(get_current_user)):
+    query = {"user_id": current_user['id']}
+    if export_data.resume_ids is not None:
+        query["id"] = {"$in": export_data.resume_ids}
+    
+    count = await db.resumes.count_documents(query)
+    if count == 0:
+        raise HTTPException(status_code=404, detail="No resumes to export")
+    if count > MAX_BULK_EXPORT:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_EXPORT} resumes per export")
+    
+    # Documents are pulled from the cursor as render slots free up
+    cursor = db.resumes.find(query, {"_id": 0}).sort("updated_at", -1)
+    
+    if export_data.format == "pdf":
+        return StreamingResponse(
+            stream_merged_pdf(cursor),
+            media_type="application/pdf",
+            headers={"Content-Disposition": "attachment; filename=resumes.pdf"}
+        )
+    
+    return StreamingResponse(
+        stream_zip(cursor),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=resumes.zip"}
+    )
+
+def _export_job_response(job: dict) -> ExportJobResponse:
+    return ExportJobResponse(**job, resume_count=len(job['resume_ids']))
+
+@api_router.post("/exports", response_model=ExportJobResponse, status_code=202)
+async def create_export_job(export_data: BulkExportRequest, current_user: dict = Depends(get_current_user)):
+    query = {"user_id": current_user['id']}
+    if export_data.resume_ids is not None:
+        query["id"] = {"$in": export_data.resume_ids}
+    
+    # Resolve the selection now so the job exports what the caller saw
+    resume_ids = [doc['id'] async for doc in db.resumes.find(query, {"_id": 0, "id": 1}).limit(MAX_BULK_EXPORT + 1)]
+    if not resume_ids:
+        raise HTTPException(status_code=404, detail="No resumes to export")
+    if len(resume_ids) > MAX_BULK_EXPORT:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_EXPORT} resumes per export")
+    
+    job = await submit_job(db, current_user['id'], resume_ids, export_data.format)
+    return _export_job_response(job)
+
+@api_router.get("/exports/{job_id}", response_model=ExportJobResponse)
+async def get_export_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30),
+    current_user: dict = Depends(get_current_user)
+):
+    # ``wait`` long-polls for up to that many seconds until the job finishes
+    if wait:
+        job = await wait_for_job(db, job_id, current_user['id'], wait)
+    else:
+        job = await get_job(db, job_id, current_user['id'])
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    
+    return _export_job_response(job)
+
+@api_router.get("/exports/{job_id}/download")
+async def download_export_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    job = await get_job(db, job_id, current_user['id'])
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job['status'] != "done":
+        raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+    
+    stream = await open_result(db, job)
+    
+    async def chunks():
+        while chunk := await stream.readchunk():
+            yield chunk
+    
+    return StreamingResponse(
+        chunks(),
+        media_type=job['content_type'],
+        headers={
+            "Content-Disposition": f"attachment; filename={job['filename']}",
+            "Content-Length": str(stream.length)
+        }
+    )
+
 @api_router.get("/resumes/{resume_id}/export/pdf")
-async def export_pdf(resume_id: str, current_user: dict = Depends(get_current_user)):
+async def export_pdf(
+    resume_id: str,
+    current_user: dict = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
     resume = await db.resumes.find_one({"id": resume_id, "user_id": current_user['id']}, {"_id": 0})
     
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    # Generate PDF
-    pdf_buffer = generate_pdf(resume, resume.get('template_id', 'ats-tech'))
+    cache_key = pdf_cache_key(resume, resume.get('template_id', 'ats-tech'))
+    etag = f'"{cache_key}"'
     
-    return StreamingResponse(
-        pdf_buffer,
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    
+    # Render on the worker pool so layout never blocks the event loop
+    try:
+        pdf_bytes, _ = await render_resume_pdf(resume)
+    except RenderQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF export is busy, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    except RenderTimeout:
+        raise HTTPException(status_code=504, detail="PDF export timed out")
+    
+    return Response(
+        content=pdf_bytes,
         media_type="application/pdf",
         headers={
-            "Content-Disposition": f"attachment; filename={resume['title'].replace(' ', '_')}.pdf"
+            "Content-Disposition": f"attachment; filename={resume['title'].replace(' ', '_')}.pdf",
+            "ETag": etag,
+            "Cache-Control": "private, no-cache"
         }
     )
 
 # Template Routes
+TEMPLATES = [
+    {
+        "id": "ats-tech",
+        "name": "ATS-Friendly Tech",
+        "description": "Clean, professional format optimized for Applicant Tracking Systems. Perfect for tech roles.",
+        "industry": "tech",
+        "experience_level": "all",
+        "preview_image": "https://images.pexels.com/photos/7793999/pexels-photo-7793999.jpeg?auto=compress&cs=tinysrgb&w=400"
+    },
+    {
+        "id": "business-pro",
+        "name": "Business Professional",
+        "description": "Traditional format with a modern touch. Ideal for business and management roles.",
+        "industry": "business",
+        "experience_level": "mid-senior",
+        "preview_image": "https://images.pexels.com/photos/8528405/pexels-photo-8528405.jpeg?auto=compress&cs=tinysrgb&w=400"
+    },
+    {
+        "id": "creative-bold",
+        "name": "Creative Bold",
+        "description": "Eye-catching design for creative professionals. Stand out while staying ATS-friendly.",
+        "industry": "creative",
+        "experience_level": "all",
+        "preview_image": "https://images.pexels.com/photos/5668858/pexels-photo-5668858.jpeg?auto=compress&cs=tinysrgb&w=400"
+    }
+]
+
+# Static, so validated by a hash computed once
+TEMPLATES_ETAG = digest_etag(TEMPLATES)
+
 @api_router.get("/templates")
-async def get_templates():
-    templates = [
-        {
-            "id": "ats-tech",
-            "name": "ATS-Friendly Tech",
-            "description": "Clean, professional format optimized for Applicant Tracking Systems. Perfect for tech roles.",
-            "industry": "tech",
-            "experience_level": "all",
-            "preview_image": "https://images.pexels.com/photos/7793999/pexels-photo-7793999.jpeg?auto=compress&cs=tinysrgb&w=400"
-        },
-        {
-            "id": "business-pro",
-            "name": "Business Professional",
-            "description": "Traditional format with a modern touch. Ideal for business and management roles.",
-            "industry": "business",
-            "experience_level": "mid-senior",
-            "preview_image": "https://images.pexels.com/photos/8528405/pexels-photo-8528405.jpeg?auto=compress&cs=tinysrgb&w=400"
-        },
-        {
-            "id": "creative-bold",
-            "name": "Creative Bold",
-            "description": "Eye-catching design for creative professionals. Stand out while staying ATS-friendly.",
-            "industry": "creative",
-            "experience_level": "all",
-            "preview_image": "https://images.pexels.com/photos/5668858/pexels-photo-5668858.jpeg?auto=compress&cs=tinysrgb&w=400"
-        }
-    ]
-    return templates
+async def get_templates(if_none_match: Optional[str] = Header(None)):
+    headers = {"ETag": TEMPLATES_ETAG, "Cache-Control": "public, no-cache"}
+    if etag_matches(if_none_match, TEMPLATES_ETAG):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(TEMPLATES, headers=headers)
+
+# Metrics
+# Caches whose hit ratios are exported
+METRIC_CACHES = {
+    "user": user_cache.local,
+    "token": token_cache,
+    "ats_score": score_cache.local,
+    "pdf": pdf_cache,
+}
+
+register_callback(
+    "cache_hits_total", "Cache lookups that found an entry.", ("cache",),
+    lambda: {(name,): cache.hits for name, cache in METRIC_CACHES.items()}, type="counter"
+)
+register_callback(
+    "cache_misses_total", "Cache lookups that found nothing.", ("cache",),
+    lambda: {(name,): cache.misses for name, cache in METRIC_CACHES.items()}, type="counter"
+)
+register_callback(
+    "cache_hit_ratio", "Hits over lookups since startup.", ("cache",),
+    lambda: {
+        (name,): cache.hits / (cache.hits + cache.misses)
+        for name, cache in METRIC_CACHES.items() if cache.hits + cache.misses
+    }
+)
+register_callback(
+    "worker_pool_tasks", "Tasks running or waiting in each bounded worker pool.", ("pool", "state"),
+    lambda: {
+        ("pdf", "running"): pdf_service.in_flight,
+        ("pdf", "waiting"): pdf_service.waiting,
+        ("password", "running"): password_service.in_flight,
+        ("password", "waiting"): password_service.waiting,
+    }
+)
+register_callback(
+    "worker_pool_rejected_total", "Tasks turned away because a worker pool queue was full.", ("pool",),
+    lambda: {("pdf",): pdf_service.rejected, ("password",): password_service.rejected}, type="counter"
+)
+register_callback(
+    "pdf_render_timeouts_total", "PDF renders that exceeded the render timeout.", (),
+    lambda: {(): pdf_service.timeouts}, type="counter"
+)
+
+@api_router.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    # Metrics name routes and load, so they are only served to a scraper holding the token
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not authorization or not hmac.compare_digest(authorization, f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=registry.render(), headers={"Content-Type": METRICS_CONTENT_TYPE})
 
 # Include the router in the main app
 app.include_router(api_router)
 
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
+# Outermost, so timings include compression and CORS handling
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -313,6 +935,92 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _start_background_task(coro, description: str) -> asyncio.Task:
+    """Run ``coro`` in the background, logging any failure as soon as it happens."""
+    def report(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"{description} failed", exc_info=task.exception())
+    
+    task = asyncio.create_task(coro)
+    task.add_done_callback(report)
+    return task
+
+# Seconds between checks for changed keyword dictionaries (0 disables hot reload)
+KEYWORD_RELOAD_INTERVAL = float(os.environ.get('ATS_KEYWORD_RELOAD_INTERVAL', '30'))
+
+async def watch_keyword_dictionaries():
+    while True:
+        await asyncio.sleep(KEYWORD_RELOAD_INTERVAL)
+        try:
+            await asyncio.to_thread(reload_keyword_index)
+        except Exception:
+            logger.exception("Keyword dictionary reload failed; keeping the current index")
+
+@app.on_event("startup")
+async def start_loop_lag_monitor():
+    app.state.loop_lag_monitor = _start_background_task(monitor_event_loop_lag(), "Event loop lag monitor")
+
+@app.on_event("startup")
+async def start_loop_watchdog():
+    if LOOP_BLOCK_THRESHOLD > 0:
+        app.state.loop_watchdog = LoopWatchdog(LOOP_BLOCK_THRESHOLD)
+        app.state.loop_watchdog.start()
+
+@app.on_event("startup")
+async def build_indexes():
+    # Runs in the background so a long build on a large collection never delays startup
+    app.state.index_builder = _start_background_task(prepare_indexes(db), "Index preparation")
+
+@app.on_event("startup")
+async def start_date_migration():
+    # Older documents hold ISO strings; convert them without delaying startup
+    app.state.date_migration = _start_background_task(migrate_iso_dates(db), "Date migration")
+
+@app.on_event("startup")
+async def prepare_job_matching():
+    app.state.terms_backfill = _start_background_task(backfill_resume_terms(db), "Resume terms backfill")
+
+@app.on_event("startup")
+async def load_keyword_dictionaries():
+    await asyncio.to_thread(get_keyword_index)
+    if KEYWORD_RELOAD_INTERVAL > 0:
+        app.state.keyword_watcher = _start_background_task(watch_keyword_dictionaries(), "Keyword dictionary watcher")
+
+@app.on_event("startup")
+async def load_token_revocations():
+    await revocations.refresh(db)
+    app.state.revocation_watcher = _start_background_task(watch_revocations(db), "Token revocation watcher")
+
+@app.on_event("startup")
+async def start_export_workers():
+    app.state.export_workers = [
+        _start_background_task(export_worker(db), "Export worker") for _ in range(EXPORT_JOB_WORKERS)
+    ]
+    app.state.export_janitor = _start_background_task(export_janitor(db), "Export janitor")
+
+@app.on_event("shutdown")
+async def stop_export_workers():
+    # An interrupted job keeps its lease and is retried once the lease lapses
+    for task in [*app.state.export_workers, app.state.export_janitor]:
+        task.cancel()
+
+@app.on_event("shutdown")
+async def stop_loop_watchdog():
+    if LOOP_BLOCK_THRESHOLD > 0:
+        app.state.loop_watchdog.stop()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
+
+@app.on_event("shutdown")
+async def shutdown_ats_workers():
+    shutdown_executor()
+
+@app.on_event("shutdown")
+async def shutdown_pdf_workers():
+    pdf_service.shutdown()
+
+@app.on_event("shutdown")
+async def shutdown_password_workers():
+    password_service.shutdown()
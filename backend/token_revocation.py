@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+# How quickly logouts and password changes made on other servers take effect
+REVOCATION_REFRESH_SECONDS = float(os.environ.get("AUTH_REVOCATION_REFRESH", "30"))
+# Overlap between refreshes so writes racing a refresh are not missed
+_REFRESH_OVERLAP = timedelta(seconds=5)
+
+
+class RevocationState:
+    """In-memory view of revoked tokens and bumped token versions.
+
+    Holds only revoked ``jti`` values until their token expires and the
+    ``token_version`` of accounts that have ever invalidated their tokens,
+    so both stay small. ``refresh`` pulls changes made by other processes;
+    changes made in this process apply immediately.
+    """
+
+    def __init__(self):
+        self.revoked: Dict[str, datetime] = {}
+        self.token_versions: Dict[str, int] = {}
+        self._since: Optional[datetime] = None
+
+    def is_revoked(self, payload: dict) -> bool:
+        if payload.get("jti") in self.revoked:
+            return True
+        return payload.get("ver", 0) < self.token_versions.get(payload.get("sub"), 0)
+
+    def _prune(self, now: datetime):
+        for jti in [jti for jti, expires_at in self.revoked.items() if expires_at <= now]:
+            del self.revoked[jti]
+
+    async def refresh(self, db):
+        now = datetime.now(timezone.utc)
+        since = self._since - _REFRESH_OVERLAP if self._since else None
+
+        query = {"expires_at": {"$gt": now}}
+        if since:
+            query["revoked_at"] = {"$gte": since}
+        async for doc in db.revoked_tokens.find(query, {"_id": 0, "jti": 1, "expires_at": 1}):
+            expires_at = doc["expires_at"]
+            self.revoked[doc["jti"]] = expires_at if expires_at.tzinfo else expires_at.replace(tzinfo=timezone.utc)
+
+        query = {"token_version": {"$gt": 0}}
+        if since:
+            query["token_version_updated_at"] = {"$gte": since}
+        async for doc in db.users.find(query, {"_id": 0, "id": 1, "token_version": 1}):
+            self.token_versions[doc["id"]] = max(doc["token_version"], self.token_versions.get(doc["id"], 0))
+
+        self._prune(now)
+        self._since = now
+
+    async def revoke_token(self, db, payload: dict) -> bool:
+        """Revoke the token ``payload`` came from.
+
+        Tokens issued before ``jti`` was added cannot be revoked one by one,
+        so every token of that user is invalidated instead; returns True then.
+        """
+        if not payload.get("jti"):
+            await self.bump_token_version(db, payload["sub"])
+            return True
+
+        expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+        self.revoked[payload["jti"]] = expires_at
+        await db.revoked_tokens.update_one(
+            {"jti": payload["jti"]},
+            {"$set": {
+                "jti": payload["jti"],
+                "user_id": payload["sub"],
+                "expires_at": expires_at,
+                "revoked_at": datetime.now(timezone.utc),
+            }},
+            upsert=True,
+        )
+        return False
+
+    async def bump_token_version(self, db, user_id: str, updates: Optional[dict] = None) -> int:
+        """Invalidate every token issued to ``user_id`` so far; returns the new version."""
+        user = await db.users.find_one_and_update(
+            {"id": user_id},
+            {
+                "$inc": {"token_version": 1},
+                "$set": {**(updates or {}), "token_version_updated_at": datetime.now(timezone.utc)},
+            },
+            projection={"token_version": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if user is None:
+            return 0
+        self.token_versions[user_id] = user["token_version"]
+        return user["token_version"]
+
+
+revocations = RevocationState()
+
+
+async def watch_revocations(db):
+    while True:
+        await asyncio.sleep(REVOCATION_REFRESH_SECONDS)
+        try:
+            await revocations.refresh(db)
+        except Exception:
+            logger.exception("Token revocation refresh failed; keeping the current state")
@@ -0,0 +1,57 @@
+import hashlib
+import os
+import time
+from typing import Optional
+
+from auth import decode_token
+from cache import LRUCache, TieredCache, shared_backend
+
+USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", "300"))
+TOKEN_CACHE_TTL = float(os.environ.get("TOKEN_CACHE_TTL", "300"))
+
+# Never cache the password hash; nothing that authenticates a request needs it
+USER_PROJECTION = {"_id": 0, "password_hash": 0}
+
+user_cache = TieredCache(
+    LRUCache(maxsize=int(os.environ.get("USER_CACHE_SIZE", "10000")), ttl=USER_CACHE_TTL),
+    shared_backend("user"),
+    shared_ttl=USER_CACHE_TTL,
+)
+
+token_cache = LRUCache(maxsize=int(os.environ.get("TOKEN_CACHE_SIZE", "10000")), ttl=TOKEN_CACHE_TTL)
+
+
+def decode_token_cached(token: str) -> Optional[dict]:
+    """``decode_token`` memoized per token; entries never outlive the token's ``exp``."""
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        if payload.get("exp", float("inf")) > time.time():
+            return payload
+        token_cache.delete(key)
+
+    payload = decode_token(token)
+    if payload:
+        ttl = min(TOKEN_CACHE_TTL, payload["exp"] - time.time()) if "exp" in payload else TOKEN_CACHE_TTL
+        if ttl > 0:
+            token_cache.set(key, payload, ttl)
+    return payload
+
+
+async def get_user(db, user_id: str) -> Optional[dict]:
+    user = await user_cache.get(user_id)
+    if user is None:
+        user = await db.users.find_one({"id": user_id}, USER_PROJECTION)
+        if user is None:
+            return None
+        await user_cache.set(user_id, user)
+    # Handlers get their own copy so they cannot mutate the cached entry
+    return dict(user)
+
+
+async def invalidate_user(user_id: str):
+    """Drop a cached user after any change to the account document.
+
+    Other processes' in-process copies expire within ``USER_CACHE_TTL``.
+    """
+    await user_cache.delete(user_id)
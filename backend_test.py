@@ -1,4 +1,5 @@
 import requests
+import os
 import sys
 import json
 from datetime import datetime
@@ -50,6 +51,8 @@ class ResumeBuilderAPITester:
                 response = requests.post(url, json=data, headers=test_headers, timeout=30)
             elif method == 'PUT':
                 response = requests.put(url, json=data, headers=test_headers, timeout=30)
+            elif method == 'PATCH':
+                response = requests.patch(url, json=data, headers=test_headers, timeout=30)
             elif method == 'DELETE':
                 response = requests.delete(url, headers=test_headers, timeout=30)
 
@@ -150,6 +153,44 @@ class ResumeBuilderAPITester:
         
         return response and 'id' in response
 
+    def test_auth_change_password_and_logout(self):
+        """Test that password changes and logout revoke tokens"""
+        test_user_data = {
+            "email": f"revoke_test_{datetime.now().strftime('%H%M%S')}@example.com",
+            "password": "TestPass123!",
+            "full_name": "Revoke Test User"
+        }
+        
+        signup_response = self.run_test(
+            "Auth - Signup for Revocation Test",
+            "POST",
+            "auth/signup",
+            200,
+            data=test_user_data
+        )
+        
+        if not signup_response:
+            return False
+        
+        old_headers = {'Authorization': f"Bearer {signup_response['token']}"}
+        response = self.run_test(
+            "Auth - Change Password",
+            "POST",
+            "auth/change-password",
+            200,
+            data={"current_password": test_user_data["password"], "new_password": "NewPass456!"},
+            headers=old_headers
+        )
+        
+        if not response:
+            return False
+        
+        self.run_test("Auth - Old Token Revoked", "GET", "auth/me", 401, headers=old_headers)
+        
+        new_headers = {'Authorization': f"Bearer {response['token']}"}
+        self.run_test("Auth - Logout", "POST", "auth/logout", 200, headers=new_headers)
+        return self.run_test("Auth - Logged Out Token Revoked", "GET", "auth/me", 401, headers=new_headers) is not None
+
     def test_templates_get(self):
         """Test get templates"""
         response = self.run_test(
@@ -254,6 +295,21 @@ class ResumeBuilderAPITester:
         
         return response and isinstance(response, list)
 
+    def test_resume_get_summary_page(self):
+        """Test paginated summary listing of resumes"""
+        if not self.token:
+            self.log_test("Resume - Get Summary Page", False, "No token available")
+            return False
+        
+        response = self.run_test(
+            "Resume - Get Summary Page",
+            "GET",
+            "resumes?view=summary&limit=1",
+            200
+        )
+        
+        return response and isinstance(response, list) and len(response) <= 1 and all('work_experience' not in r for r in response)
+
     def test_resume_get_one(self):
         """Test get single resume"""
         if not self.token or not self.resume_id:
@@ -269,6 +325,22 @@ class ResumeBuilderAPITester:
         
         return response and response.get('id') == self.resume_id
 
+    def test_resume_not_modified(self):
+        """Test conditional get of an unchanged resume"""
+        if not self.token or not self.resume_id:
+            self.log_test("Resume - Not Modified", False, "No token or resume ID available")
+            return False
+        
+        response = self.run_test(
+            "Resume - Not Modified",
+            "GET",
+            f"resumes/{self.resume_id}",
+            304,
+            headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+        )
+        
+        return response is not None
+
     def test_resume_update(self):
         """Test update resume"""
         if not self.token or not self.resume_id:
@@ -290,6 +362,46 @@ class ResumeBuilderAPITester:
         
         return response and response.get('title') == "Updated Test Resume"
 
+    def test_resume_patch(self):
+        """Test delta update of resume fields"""
+        if not self.token or not self.resume_id:
+            self.log_test("Resume - Patch", False, "No token or resume ID available")
+            return False
+        
+        patch_data = {
+            "operations": [
+                {"op": "add", "path": "/skills", "value": "Kubernetes"},
+                {"op": "replace", "path": "/personal_info/location", "value": "Remote"}
+            ]
+        }
+        
+        response = self.run_test(
+            "Resume - Patch",
+            "PATCH",
+            f"resumes/{self.resume_id}",
+            200,
+            data=patch_data
+        )
+        
+        return response and "Kubernetes" in response.get('skills', []) and response['personal_info']['location'] == "Remote"
+
+    def test_resume_update_conflict(self):
+        """Test that a stale If-Match update is rejected"""
+        if not self.token or not self.resume_id:
+            self.log_test("Resume - Update Conflict", False, "No token or resume ID available")
+            return False
+        
+        response = self.run_test(
+            "Resume - Update With Stale Version",
+            "PUT",
+            f"resumes/{self.resume_id}",
+            412,
+            data={"title": "Stale Update"},
+            headers={"If-Match": '"v0"'}
+        )
+        
+        return response is not None
+
     def test_resume_ats_score(self):
         """Test get ATS score"""
         if not self.token or not self.resume_id:
@@ -354,6 +466,127 @@ class ResumeBuilderAPITester:
             self.log_test("Resume - Export PDF", False, f"Exception: {str(e)}")
             return False
 
+    def test_resume_bulk_export(self):
+        """Test bulk export of resumes as a ZIP archive"""
+        if not self.token or not self.resume_id:
+            self.log_test("Resume - Bulk Export", False, "No token or resume ID available")
+            return False
+        
+        url = f"{self.base_url}/resumes/export"
+        headers = {'Authorization': f'Bearer {self.token}'}
+        
+        try:
+            response = requests.post(url, json={"resume_ids": [self.resume_id], "format": "zip"}, headers=headers, timeout=60)
+            success = response.status_code == 200 and response.headers.get('content-type') == 'application/zip'
+            self.log_test("Resume - Bulk Export", success, f"Status: {response.status_code}, Size: {len(response.content)} bytes")
+            return success
+        except Exception as e:
+            self.log_test("Resume - Bulk Export", False, f"Exception: {str(e)}")
+            return False
+
+    def test_export_job(self):
+        """Test asynchronous export job submission, polling and download"""
+        if not self.token or not self.resume_id:
+            self.log_test("Resume - Export Job", False, "No token or resume ID available")
+            return False
+        
+        headers = {'Authorization': f'Bearer {self.token}'}
+        
+        try:
+            response = requests.post(f"{self.base_url}/exports", json={"resume_ids": [self.resume_id], "format": "zip"}, headers=headers, timeout=30)
+            if response.status_code != 202:
+                self.log_test("Resume - Export Job", False, f"Submit status: {response.status_code}")
+                return False
+            job_id = response.json()['id']
+            
+            job = requests.get(f"{self.base_url}/exports/{job_id}", params={"wait": 30}, headers=headers, timeout=60).json()
+            if job.get('status') != "done":
+                self.log_test("Resume - Export Job", False, f"Job status: {job.get('status')}")
+                return False
+            
+            download = requests.get(f"{self.base_url}/exports/{job_id}/download", headers=headers, timeout=60)
+            success = download.status_code == 200 and download.headers.get('content-type') == 'application/zip'
+            self.log_test("Resume - Export Job", success, f"Status: {download.status_code}, Size: {len(download.content)} bytes")
+            return success
+        except Exception as e:
+            self.log_test("Resume - Export Job", False, f"Exception: {str(e)}")
+            return False
+
+    def test_ats_batch(self):
+        """Test batch ATS scoring of stored resumes"""
+        if not self.token or not self.resume_id:
+            self.log_test("ATS - Batch Score", False, "No token or resume ID available")
+            return False
+        
+        url = f"{self.base_url}/ats/batch"
+        headers = {'Authorization': f'Bearer {self.token}'}
+        data = {"resume_ids": [self.resume_id, "missing-resume-id"]}
+        
+        try:
+            response = requests.post(url, json=data, headers=headers, timeout=60)
+            lines = [json.loads(line) for line in response.text.splitlines() if line]
+            scored = [line for line in lines if line.get('id') == self.resume_id and 'score' in line]
+            missing = [line for line in lines if line.get('id') == "missing-resume-id" and 'error' in line]
+            success = response.status_code == 200 and len(scored) == 1 and len(missing) == 1
+            
+            self.log_test("ATS - Batch Score", success, f"Status: {response.status_code}, Lines: {len(lines)}")
+            return success
+        except Exception as e:
+            self.log_test("ATS - Batch Score", False, f"Exception: {str(e)}")
+            return False
+
+    def test_job_match(self):
+        """Test matching resumes against a job description"""
+        if not self.token or not self.resume_id:
+            self.log_test("Jobs - Match", False, "No token or resume ID available")
+            return False
+        
+        response = self.run_test(
+            "Jobs - Match",
+            "POST",
+            "jobs/match",
+            200,
+            data={
+                "job_description": "Senior Python developer with React, Docker and AWS. Python and FastAPI required.",
+                "resume_id": self.resume_id
+            }
+        )
+        
+        if response and response.get('results'):
+            result = response['results'][0]
+            self.log_test("Jobs - Match Details", result['resume_id'] == self.resume_id, f"Score: {result['score']}, Matched: {len(result['matched_terms'])}")
+            return True
+        return False
+
+    def test_metrics(self):
+        """Test that requests show up in the Prometheus metrics by route template"""
+        token = os.environ.get("METRICS_TOKEN")
+        url = f"{self.base_url}/metrics"
+        
+        try:
+            if not token:
+                # Without a token the endpoint is switched off
+                response = requests.get(url, timeout=30)
+                success = response.status_code == 404
+                self.log_test("Metrics - Disabled Without Token", success, f"Status: {response.status_code}")
+                return success
+            
+            self.run_test("Metrics - Templates Request", "GET", "templates", 200)
+            denied = requests.get(url, headers={'Authorization': 'Bearer wrong-token'}, timeout=30)
+            self.log_test("Metrics - Wrong Token", denied.status_code == 401, f"Status: {denied.status_code}")
+            
+            response = requests.get(url, headers={'Authorization': f'Bearer {token}'}, timeout=30)
+            series = [
+                line for line in response.text.splitlines()
+                if line.startswith("http_requests_total{") and 'route="/api/templates"' in line
+            ]
+            success = response.status_code == 200 and len(series) > 0
+            self.log_test("Metrics - Route Series", success, f"Status: {response.status_code}, Series: {series[:1]}")
+            return success
+        except Exception as e:
+            self.log_test("Metrics - Route Series", False, f"Exception: {str(e)}")
+            return False
+
     def test_resume_delete(self):
         """Test delete resume"""
         if not self.token or not self.resume_id:
@@ -380,6 +613,7 @@ class ResumeBuilderAPITester:
         self.test_auth_signup()
         self.test_auth_login()
         self.test_auth_me()
+        self.test_auth_change_password_and_logout()
         
         # Template Tests
         print("\n📋 Template Tests")
@@ -389,13 +623,25 @@ class ResumeBuilderAPITester:
         print("\n📋 Resume Tests")
         self.test_resume_create()
         self.test_resume_get_all()
+        self.test_resume_get_summary_page()
         self.test_resume_get_one()
+        self.test_resume_not_modified()
         self.test_resume_update()
+        self.test_resume_patch()
+        self.test_resume_update_conflict()
         self.test_resume_ats_score()
         self.test_resume_duplicate()
         self.test_resume_export_pdf()
+        self.test_resume_bulk_export()
+        self.test_export_job()
+        self.test_ats_batch()
+        self.test_job_match()
         self.test_resume_delete()
         
+        # Metrics Tests
+        print("\n📋 Metrics Tests")
+        self.test_metrics()
+        
         # Print Summary
         print("\n" + "=" * 60)
         print(f"📊 Test Summary: {self.tests_passed}/{self.tests_run} tests passed")
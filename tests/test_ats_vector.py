@@ -0,0 +1,47 @@
+import random
+
+from ats_engine import calculate_ats_score
+from ats_vector import vector_scores
+from keyword_dictionary import get_keyword_index
+
+
+def _sample_resumes(count=300, seed=7):
+    rng = random.Random(seed)
+    # Dictionary terms plus near misses that must not count as keywords
+    words = get_keyword_index().terms + ["javascripting", "sqlite", "node", "building", "team", "c++", "foo"]
+
+    def text(n):
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    resumes = [{}, {"personal_info": None, "skills": [], "work_experience": []}]
+    for _ in range(count):
+        resumes.append({
+            "personal_info": {"full_name": text(2), "email": "x@example.com"} if rng.random() < 0.8 else None,
+            "professional_summary": text(rng.randint(0, 30)),
+            "skills": [text(1) for _ in range(rng.randint(0, 8))],
+            "work_experience": [
+                {"position": text(2), "company": text(1), "description": [text(10) for _ in range(rng.randint(0, 3))]}
+                for _ in range(rng.randint(0, 3))
+            ],
+            "education": [{"degree": text(1), "field": text(1), "institution": text(1)}] * rng.randint(0, 2),
+            "projects": [
+                {"name": text(1), "description": text(8), "technologies": [text(1) for _ in range(rng.randint(0, 3))]}
+                for _ in range(rng.randint(0, 2))
+            ],
+            "certifications": [{"name": text(2), "issuer": text(1)}] * rng.randint(0, 1),
+        })
+    return resumes
+
+
+def test_vector_scores_match_full_scores():
+    resumes = _sample_resumes()
+
+    vector = vector_scores(resumes)
+
+    assert [result["score"] for result in vector] == [calculate_ats_score(resume)["score"] for resume in resumes]
+
+
+def test_vector_extras_are_in_range():
+    for result in vector_scores(_sample_resumes(count=50)):
+        assert 0 <= result["coverage"] <= 1
+        assert 0 <= result["similarity"] <= 1
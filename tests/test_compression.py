@@ -0,0 +1,99 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+import compression
+from compression import CompressionMiddleware, choose_encoding
+
+ETAG = '"abc123"'
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODERS", {"gzip": compression._GzipEncoder})
+
+
+def test_choose_encoding_honours_q_values(gzip_only):
+    assert choose_encoding("gzip") == "gzip"
+    assert choose_encoding("gzip;q=0.5, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("*;q=0.1") == "gzip"
+    assert choose_encoding("*, gzip;q=0") is None
+    assert choose_encoding("") is None
+
+
+def test_identity_only_is_sent_uncompressed(gzip_only):
+    assert choose_encoding("identity") is None
+    assert choose_encoding("identity;q=0") is None
+
+
+def test_unavailable_encodings_are_skipped(gzip_only):
+    assert choose_encoding("br, zstd") is None
+    assert choose_encoding("br;q=1, zstd;q=0.9, gzip;q=0.1") == "gzip"
+
+
+def test_server_preference_breaks_ties(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODERS", {"br": object, "gzip": compression._GzipEncoder})
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip, br;q=0.5") == "gzip"
+
+
+def _client():
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big():
+        return Response("x" * 5000, media_type="application/json", headers={"ETag": ETAG})
+
+    @app.get("/small")
+    async def small():
+        return Response("{}", media_type="application/json", headers={"ETag": ETAG})
+
+    @app.get("/pdf")
+    async def pdf():
+        return Response(b"%PDF" * 2000, media_type="application/pdf", headers={"ETag": ETAG})
+
+    @app.get("/cached")
+    async def cached():
+        return Response(status_code=304, headers={"ETag": ETAG})
+
+    return TestClient(CompressionMiddleware(app, minimum_size=1024))
+
+
+def test_compressed_response_gets_weak_etag(gzip_only):
+    response = _client().get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == f"W/{ETAG}"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.text == "x" * 5000
+    assert int(response.headers["content-length"]) < 5000
+
+
+def test_uncompressed_responses_keep_strong_etag(gzip_only):
+    client = _client()
+    for path in ("/small", "/pdf"):
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == ETAG
+    assert _client().get("/big", headers={"Accept-Encoding": "identity"}).headers["etag"] == ETAG
+
+
+def test_not_modified_matches_compressed_etag(gzip_only):
+    client = _client()
+
+    compressed = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    not_modified = client.get("/cached", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/cached", headers={"Accept-Encoding": "identity"})
+
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == compressed.headers["etag"] == f"W/{ETAG}"
+    assert identity.headers["etag"] == ETAG
+
+
+def test_gzip_encoder_round_trips_streamed_chunks(gzip_only):
+    encoder = compression._GzipEncoder()
+    body = encoder.compress(b"hello ") + encoder.compress(b"world") + encoder.finish()
+    assert gzip.decompress(body) == b"hello world"
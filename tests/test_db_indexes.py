@@ -0,0 +1,37 @@
+import asyncio
+
+from pymongo.errors import DuplicateKeyError
+
+import db_indexes
+
+
+class FakeCollection:
+    def __init__(self, name):
+        self.name = name
+        self.indexes = {"_id_": {"key": [("_id", 1)]}}
+
+    async def index_information(self):
+        return self.indexes
+
+    async def create_index(self, keys, name, **options):
+        if name == "email_1":
+            raise DuplicateKeyError("E11000 duplicate key error collection: users index: email_1")
+        self.indexes[name] = {"key": keys}
+        return name
+
+
+class FakeDb(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection(name)
+        return self[name]
+
+
+def test_one_failing_index_does_not_block_the_others():
+    db = FakeDb()
+
+    created = asyncio.run(db_indexes.ensure_indexes(db))
+
+    assert "email_1" not in created
+    assert "id_1" in db["users"].indexes
+    assert "token_version_updated_at_1" in db["users"].indexes
+    assert len(created) == sum(len(models) for models in db_indexes.INDEXES.values()) - 1
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from diagnostics import PROFILE_HEADER, LoopWatchdog, ProfilerMiddleware, loop_blocks
+
+
+def test_watchdog_counts_blocking_call_on_loop():
+    before = loop_blocks.value()
+
+    async def block_loop():
+        watchdog = LoopWatchdog(0.1)
+        watchdog.start()
+        await asyncio.sleep(0.1)
+        time.sleep(0.4)
+        await asyncio.sleep(0.1)
+        watchdog.stop()
+
+    asyncio.run(block_loop())
+    assert loop_blocks.value() > before
+
+
+def test_profile_header_writes_profile(tmp_path):
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    profiled = ProfilerMiddleware(app, sample_rate=0, token="secret", mode="sample", directory=tmp_path)
+    with TestClient(profiled) as client:
+        assert client.get("/api/ping").status_code == 200
+        assert list(tmp_path.iterdir()) == []
+        assert client.get("/api/ping", headers={PROFILE_HEADER: "secret"}).status_code == 200
+
+    profiles = list(tmp_path.iterdir())
+    assert len(profiles) == 1
+    assert profiles[0].name.endswith(".folded")
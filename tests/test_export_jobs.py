@@ -0,0 +1,59 @@
+import asyncio
+from types import SimpleNamespace
+
+import export_jobs
+
+
+class FakeJobs:
+    def __init__(self):
+        self.updates = []
+
+    async def update_one(self, query, update):
+        self.updates.append((query, update))
+        return SimpleNamespace(matched_count=1)
+
+
+def _job(attempts=1):
+    return {"id": "j1", "user_id": "u1", "attempts": attempts, "lease_id": "lease"}
+
+
+def test_run_job_records_failure_when_gridfs_is_unavailable(monkeypatch):
+    def broken_bucket(db, bucket_name):
+        raise ConnectionError("mongo went away")
+
+    monkeypatch.setattr(export_jobs, "AsyncIOMotorGridFSBucket", broken_bucket)
+    db = SimpleNamespace(export_jobs=FakeJobs())
+
+    asyncio.run(export_jobs.run_job(db, _job()))
+
+    [(query, update)] = db.export_jobs.updates
+    assert query == {"id": "j1", "worker_id": export_jobs.WORKER_ID, "lease_id": "lease"}
+    assert update["$set"]["status"] == "queued"
+    assert update["$set"]["error"] == "mongo went away"
+
+
+def test_export_worker_survives_a_job_that_raises(monkeypatch, caplog):
+    claims = []
+
+    async def claim_job(db):
+        if len(claims) == 2:
+            raise asyncio.CancelledError()
+        claims.append(_job())
+        return claims[-1]
+
+    async def run_job(db, job):
+        raise ConnectionError("mongo went away")
+
+    monkeypatch.setattr(export_jobs, "claim_job", claim_job)
+    monkeypatch.setattr(export_jobs, "run_job", run_job)
+
+    async def main():
+        try:
+            await export_jobs.export_worker(None)
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+
+    assert len(claims) == 2
+    assert "Export worker could not finish job j1" in caplog.text
@@ -0,0 +1,14 @@
+from http_cache import if_match_versions, version_etag
+
+
+def test_resume_etag_changes_with_score_but_if_match_compares_version():
+    before, after = version_etag(3, 72.5), version_etag(3, 80)
+    assert before != after
+    assert if_match_versions(before) == [3]
+    assert if_match_versions(f"W/{after}") == [3]
+
+
+def test_if_match_accepts_version_only_tags():
+    assert if_match_versions('"v0", "v2"') == [0, 2]
+    assert if_match_versions('"abc", "v1-x-"') == [1]
+    assert if_match_versions("*") is None
@@ -0,0 +1,35 @@
+from keyword_matcher import KeywordMatcher
+
+
+def _find(keywords, text):
+    return KeywordMatcher(keywords).find_keywords(text.lower())
+
+
+def test_java_is_not_found_inside_javascript():
+    assert _find(["java", "javascript"], "javascript developer") == {"javascript"}
+    assert _find(["java", "javascript"], "java and javascript") == {"java", "javascript"}
+
+
+def test_keywords_at_start_and_end_of_text():
+    assert _find(["python", "sql"], "python") == {"python"}
+    assert _find(["python", "sql"], "python, sql") == {"python", "sql"}
+    assert _find(["sql"], "mysql") == set()
+    assert _find(["sql"], "sqlite") == set()
+
+
+def test_keywords_with_punctuation():
+    assert _find(["c++"], "c++ developer") == {"c++"}
+    assert _find(["c++"], "modern c++") == {"c++"}
+    assert _find(["c++"], "c++17") == set()
+    assert _find(["node.js"], "built with node.js.") == {"node.js"}
+    assert _find(["node.js"], "nodexjs") == set()
+
+
+def test_overlapping_phrases_are_all_reported():
+    assert _find(["data analysis", "analysis", "data"], "big data analysis") == {"data analysis", "analysis", "data"}
+
+
+def test_duplicate_keywords_and_counts():
+    matcher = KeywordMatcher(["AWS", "aws ", "docker"])
+    assert matcher.keywords == ["aws", "docker"]
+    assert matcher.count("aws, docker and more aws") == {0: 2, 1: 1}
@@ -0,0 +1,27 @@
+import asyncio
+import zipfile
+from io import BytesIO
+
+import pdf_bulk
+
+
+def _collect(stream) -> bytes:
+    async def run():
+        return b"".join([chunk async for chunk in stream])
+    return asyncio.run(run())
+
+
+def test_failed_render_is_listed_in_errors_txt(monkeypatch):
+    async def render(resume):
+        if resume["id"] == "broken":
+            raise ValueError("malformed resume")
+        return b"%PDF-1.4 " + resume["id"].encode(), "key"
+
+    monkeypatch.setattr(pdf_bulk, "render_resume_pdf", render)
+    resumes = [{"id": "ok", "title": "Good"}, {"id": "broken", "title": "Bad"}]
+
+    archive = zipfile.ZipFile(BytesIO(_collect(pdf_bulk.stream_zip(resumes))))
+
+    assert sorted(archive.namelist()) == ["Good.pdf", "errors.txt"]
+    errors = archive.read("errors.txt").decode()
+    assert "Bad (broken): ValueError" in errors
@@ -0,0 +1,117 @@
+import pytest
+
+from models import ResumePatchOperation
+from resume_patch import InvalidPatch, PatchTargetNotFound, plan_patch
+
+
+def _job(item_id, company, description=()):
+    return {
+        "id": item_id, "company": company, "position": "Engineer", "location": "",
+        "start_date": "2020", "end_date": "2021", "current": False, "description": list(description),
+    }
+
+
+DOCUMENT = {
+    "title": "Resume",
+    "skills": ["python", "sql"],
+    "work_experience": [_job("w1", "Acme", ["built apis"]), _job("w2", "Globex")],
+}
+
+
+def _plan(*operations):
+    return plan_patch(DOCUMENT, [ResumePatchOperation(**operation) for operation in operations])
+
+
+def test_replace_scalar_sets_the_field():
+    plan = _plan({"op": "replace", "path": "/title", "value": "New"})
+
+    assert plan.update == {"$set": {"title": "New"}}
+    assert plan.fields == {"title": "New"}
+
+
+def test_add_skill_at_position_uses_push_with_position():
+    plan = _plan({"op": "add", "path": "/skills", "value": "docker", "position": 0})
+
+    assert plan.update == {"$push": {"skills": {"$each": ["docker"], "$position": 0}}}
+    assert plan.fields["skills"] == ["docker", "python", "sql"]
+
+
+def test_append_skill_omits_position():
+    plan = _plan({"op": "add", "path": "/skills", "value": "docker"})
+
+    assert plan.update == {"$push": {"skills": {"$each": ["docker"]}}}
+    assert plan.fields["skills"] == ["python", "sql", "docker"]
+
+
+def test_replace_item_attribute_uses_array_filter():
+    plan = _plan({"op": "replace", "path": "/work_experience/w2/company", "value": "Initech"})
+
+    assert plan.update == {"$set": {"work_experience.$[i0].company": "Initech"}}
+    assert plan.array_filters == [{"i0.id": "w2"}]
+    assert [item["company"] for item in plan.fields["work_experience"]] == ["Acme", "Initech"]
+
+
+def test_replace_bullet_by_index():
+    plan = _plan({"op": "replace", "path": "/work_experience/w1/description/0", "value": "led apis"})
+
+    assert plan.update == {"$set": {"work_experience.$[i0].description.0": "led apis"}}
+    assert plan.fields["work_experience"][0]["description"] == ["led apis"]
+
+
+def test_remove_item_uses_pull():
+    plan = _plan({"op": "remove", "path": "/work_experience/w1"})
+
+    assert plan.update == {"$pull": {"work_experience": {"id": "w1"}}}
+    assert plan.array_filters == []
+    assert [item["id"] for item in plan.fields["work_experience"]] == ["w2"]
+
+
+def test_remove_by_index_rewrites_the_section():
+    plan = _plan({"op": "remove", "path": "/skills/0"})
+
+    assert plan.update == {"$set": {"skills": ["sql"]}}
+
+
+def test_move_item_rewrites_the_section():
+    plan = _plan({"op": "move", "path": "/work_experience/w2", "position": 0})
+
+    assert list(plan.update) == ["$set"]
+    assert [item["id"] for item in plan.update["$set"]["work_experience"]] == ["w2", "w1"]
+
+
+def test_overlapping_paths_fall_back_to_the_whole_section():
+    plan = _plan(
+        {"op": "replace", "path": "/work_experience/w1/description/0", "value": "led apis"},
+        {"op": "replace", "path": "/work_experience/w1/description", "value": ["a", "b"]},
+        {"op": "replace", "path": "/title", "value": "New"},
+    )
+
+    assert plan.update["$set"]["title"] == "New"
+    assert plan.update["$set"]["work_experience"][0]["description"] == ["a", "b"]
+    assert set(plan.update) == {"$set"}
+    assert plan.array_filters == []
+
+
+def test_added_item_then_edited_falls_back():
+    new_job = {**_job("w3", "Hooli"), "description": []}
+    plan = _plan(
+        {"op": "add", "path": "/work_experience", "value": new_job, "position": 0},
+        {"op": "add", "path": "/work_experience/w3/description", "value": "shipped"},
+    )
+
+    assert set(plan.update) == {"$set"}
+    assert [item["id"] for item in plan.update["$set"]["work_experience"]] == ["w3", "w1", "w2"]
+    assert plan.update["$set"]["work_experience"][0]["description"] == ["shipped"]
+
+
+def test_missing_targets_and_bad_operations():
+    with pytest.raises(PatchTargetNotFound):
+        _plan({"op": "remove", "path": "/work_experience/nope"})
+    with pytest.raises(PatchTargetNotFound):
+        _plan({"op": "replace", "path": "/skills/2", "value": "x"})
+    with pytest.raises(InvalidPatch):
+        _plan({"op": "move", "path": "/work_experience/w1", "position": 5})
+    with pytest.raises(InvalidPatch):
+        _plan({"op": "add", "path": "/work_experience", "value": _job("w1", "Dup")})
+    with pytest.raises(InvalidPatch):
+        _plan({"op": "replace", "path": "/unknown", "value": "x"})
@@ -0,0 +1,51 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from token_revocation import RevocationState
+
+
+class FakeCollection:
+    """Just enough of a Motor collection for RevocationState."""
+
+    def __init__(self, docs=None):
+        self.docs = docs or []
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        for doc in self.docs:
+            if all(doc.get(key) == value for key, value in query.items()):
+                for key, amount in update.get("$inc", {}).items():
+                    doc[key] = doc.get(key, 0) + amount
+                doc.update(update.get("$set", {}))
+                return dict(doc)
+        return None
+
+    async def update_one(self, query, update, upsert=False):
+        doc = {**query, **update.get("$set", {})}
+        self.docs.append(doc)
+        return SimpleNamespace(matched_count=0, upserted_id=len(self.docs))
+
+
+def test_logout_with_token_without_jti_revokes_all_user_tokens():
+    db = SimpleNamespace(users=FakeCollection([{"id": "u1", "token_version": 0}]), revoked_tokens=FakeCollection())
+    state = RevocationState()
+    legacy_payload = {"sub": "u1", "exp": time.time() + 3600}
+
+    all_sessions = asyncio.run(state.revoke_token(db, legacy_payload))
+
+    assert all_sessions is True
+    assert state.is_revoked(legacy_payload)
+    assert not state.is_revoked({"sub": "u1", "jti": "new", "ver": 1})
+    assert db.revoked_tokens.docs == []
+
+
+def test_logout_with_jti_revokes_only_that_token():
+    db = SimpleNamespace(users=FakeCollection([{"id": "u1", "token_version": 0}]), revoked_tokens=FakeCollection())
+    state = RevocationState()
+    payload = {"sub": "u1", "jti": "abc", "exp": time.time() + 3600}
+
+    all_sessions = asyncio.run(state.revoke_token(db, payload))
+
+    assert all_sessions is False
+    assert state.is_revoked(payload)
+    assert not state.is_revoked({"sub": "u1", "jti": "other"})